@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Colonnes du jeu de données utilisées par build_analysis_store
+ANALYSIS_COLUMNS = [
+    "name", "category", "rating", "reviews", "calories", "total_time_min",
+    "fat", "sugar", "protein",
+]
+
+
+@dataclass
+class AnalysisStore:
+    """
+    Tables pré-calculées pour la page "Overall analysis".
+    Chaque graphe n'a plus qu'à filtrer / couper une de ces tables.
+
+    - popular : recettes notées, triées par pop_score décroissant
+    - category_time : nombre de recettes et temps moyen par catégorie
+      (hors catégories de durée '< 60 Mins'...), triées par temps moyen
+    - bubble : recettes avec note, avis, calories et temps > 0 (ordre d'origine)
+    - nutrition : moyennes fat / sugar / protein par catégorie
+    - optimised : recettes triées par score composite décroissant
+    - rating_range : (note min, note max) sur tout le jeu de données
+    """
+    popular: pd.DataFrame
+    category_time: pd.DataFrame
+    bubble: pd.DataFrame
+    nutrition: pd.DataFrame
+    optimised: pd.DataFrame
+    rating_range: tuple
+
+
+def _norm_col(s: pd.Series) -> pd.Series:
+    s = s.astype(float)
+    denom = s.max() - s.min()
+    if denom == 0:
+        return s * 0 + 0.5
+    return (s - s.min()) / denom
+
+
+def _short(s: pd.Series, n: int) -> pd.Series:
+    return s.where(s.str.len() <= n, s.str[: n - 3] + "...")
+
+
+def build_analysis_store(df: pd.DataFrame) -> AnalysisStore:
+    """Calcule toutes les tables de la page d'analyse, une fois au chargement."""
+    cols = ["name", "category", "rating", "reviews", "calories", "total_time_min"]
+    base = df[cols].copy()
+
+    # Recettes les plus populaires
+    popular = base[base[["rating", "reviews"]].notna().all(axis=1)].copy()
+    popular["pop_score"] = popular["rating"] * np.log1p(popular["reviews"])
+    popular = popular.sort_values("pop_score", ascending=False, kind="stable")
+
+    # Temps moyen par catégorie (on supprime les catégories qui représentent une durée)
+    clean = base[~base["category"].str.contains("<", na=False)]
+    category_time = (
+        clean.groupby("category")["total_time_min"]
+        .agg(n_recipes="size", total_time_min="mean")
+        .reset_index()
+        .sort_values("total_time_min", kind="stable")
+    )
+    category_time["category_short"] = _short(category_time["category"], 30)
+
+    # Popularité vs calories
+    bubble = base[base[["rating", "reviews", "calories", "total_time_min"]].notna().all(axis=1)]
+    bubble = bubble[(bubble["calories"] > 0) & (bubble["total_time_min"] > 0)]
+
+    # Profils nutritionnels
+    nutrition = (
+        df.groupby("category")[["fat", "sugar", "protein"]]
+        .mean(numeric_only=True)
+        .dropna()
+    )
+
+    # Score composite Qualité / Temps / Calories
+    optimised = base[base[["rating", "total_time_min", "calories"]].notna().all(axis=1)]
+    optimised = optimised[(optimised["total_time_min"] > 0) & (optimised["calories"] > 0)].copy()
+    optimised["score"] = (
+        0.4 * _norm_col(optimised["rating"])
+        + 0.3 * _norm_col(1 / optimised["total_time_min"])
+        + 0.3 * _norm_col(1 / optimised["calories"])
+    )
+    optimised = optimised.sort_values("score", ascending=False, kind="stable")
+    optimised["name_short"] = _short(optimised["name"], 40)
+
+    return AnalysisStore(
+        popular=popular,
+        category_time=category_time,
+        bubble=bubble,
+        nutrition=nutrition,
+        optimised=optimised,
+        rating_range=(df["rating"].min(), df["rating"].max()),
+    )
@@ -1,5 +1,10 @@
+import os
+import pandas as pd
 import streamlit as st
-from data_pipeline import load_recipes
+from data_pipeline import (
+    load_dataset, load_query_engine, load_analysis_store, load_detail_cache, load_query_cache,
+    ingestion_reports,
+)
 from pages_recettes import render_recipes_page
 from pages_analyses import render_global_analysis_page
 
@@ -41,11 +46,9 @@ st.markdown("""
 
 
 
-@st.cache_data
-def load_data():
-    return load_recipes()
-    
-df = load_data()
+# Jeu de données partagé par toutes les sessions (aucune copie par rerun)
+# et, via les fichiers en mmap du snapshot, par tous les processus
+df = load_dataset()
 
 
 # STYLE GLOBAL
@@ -85,6 +88,26 @@ page = st.sidebar.radio(
 )
 
 
+# PANNEAU DE DEBUG (télémétrie de l'ingestion)
+# Visible avec ?debug=1 dans l'URL ou RECIPE_FINDER_DEBUG=1
+# (lignes JSON dans les logs : RECIPE_FINDER_LOG_LEVEL=INFO, voir telemetrie)
+
+if st.query_params.get("debug") == "1" or os.environ.get("RECIPE_FINDER_DEBUG") == "1":
+    with st.sidebar.expander("\U0001F6E0 Ingestion telemetry"):
+        for label, report in ingestion_reports().items():
+            if report is None:
+                continue
+            st.markdown(f"**{label.capitalize()}** ({report.mode}) — {report.total_wall_s:.2f} s")
+            st.dataframe(
+                pd.DataFrame([vars(s) for s in report.stages.values()]).set_index("name"),
+                width="stretch",
+            )
+        st.markdown("**Recipe detail cache**")
+        st.json(load_detail_cache().stats())
+        st.markdown("**Query result cache**")
+        st.json(load_query_cache().stats())
+
+
 # ACCUEIL
 
 
@@ -176,10 +199,10 @@ if page == "Home":
 
 # RECETTES 
 elif page == "Recipes":
-    render_recipes_page(df)
+    render_recipes_page(df, load_query_engine(), load_detail_cache(), load_query_cache())
 
 # ANALYSE GLOBALE
 elif page == "Overall analysis":
-    render_global_analysis_page(df)
+    render_global_analysis_page(load_analysis_store())
 
 
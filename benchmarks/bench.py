@@ -0,0 +1,236 @@
+"""
+Benchmarks du pipeline et des recherches sur un CSV synthétique.
+
+    python benchmarks/bench.py --size 100k --out bench_100k.json
+    python benchmarks/bench.py --size 100k --baseline bench_100k.json --threshold 0.25
+
+Chaque étape de load_recipes (lecture, nettoyage, vecteurs R, ingrédients,
+temps, index) et chaque opération de recherche / analyse est chronométrée
+séparément, avec le pic mémoire Python+numpy (tracemalloc, sur une exécution à part). Le résultat est
+un JSON ; avec --baseline, les étapes plus lentes que la référence au-delà du
+seuil sont signalées et le code de sortie vaut 1.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from generer_csv import SIZES, generate_csv  # noqa: E402
+from nettoyage import clean_recipe_df  # noqa: E402
+from forme_list import (  # noqa: E402
+    apply_r_vectors, clean_ingredients_column, detect_r_vector_columns, format_time_columns,
+)
+from index_ingredients import (  # noqa: E402
+    build_ingredient_index, ingredient_lists, match_all_ingredients, pantry_match, suggest_ingredients,
+)
+from index_noms import build_name_index, substring_search, fuzzy_search  # noqa: E402
+from index_texte import build_text_index, bm25_search  # noqa: E402
+from index_plages import build_range_index  # noqa: E402
+from agregats_analyses import build_analysis_store  # noqa: E402
+from data_pipeline import run_pipeline_streaming, CHUNK_SIZE, LAZY_R_COLUMNS  # noqa: E402
+from moteur_recherche import RecipeQuery, RecipeQueryEngine  # noqa: E402
+
+# Écart relatif toléré par défaut avant de signaler une régression
+DEFAULT_THRESHOLD = 0.20
+
+# En dessous de cette durée, les écarts relatifs ne sont que du bruit
+MIN_SECONDS = 0.005
+
+DATA_CACHE = Path.home() / ".recipe_finder" / "bench"
+
+# Mesure du pic mémoire (désactivable avec --no-memory sur les gros jeux)
+TRACE_MEMORY = True
+
+
+def measure(results: dict, name: str, fn, *args, repeat: int = 1, **kwargs):
+    """
+    Exécute fn `repeat` fois et garde la meilleure durée (s), puis une fois
+    de plus sous tracemalloc pour le pic mémoire (Mo) : le traçage ralentit
+    les allocations, il ne doit pas fausser les durées. Les fonctions mesurées
+    ne modifient pas leurs arguments. Renvoie le résultat de fn.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - t)
+
+    entry = {"seconds": round(best, 6)}
+    if TRACE_MEMORY:
+        del out
+        tracemalloc.start()
+        out = fn(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        entry["peak_mb"] = round(peak / 2**20, 2)
+
+    results[name] = entry
+    print(f"{name:<32} {best:10.4f} s {entry.get('peak_mb', float('nan')):10.1f} MB", file=sys.stderr)
+    return out
+
+
+def bench_pipeline(results: dict, csv_path: Path, repeat: int) -> pd.DataFrame:
+    """Étapes de load_recipes, une par une (lecture d'un coup)."""
+    df = measure(results, "pipeline.read_csv", pd.read_csv, csv_path, repeat=repeat)
+    df = measure(results, "pipeline.clean_recipe_df", clean_recipe_df, df, repeat=repeat)
+    r_cols = [c for c in detect_r_vector_columns(df) if c not in LAZY_R_COLUMNS]
+    df = measure(results, "pipeline.apply_r_vectors", apply_r_vectors, df, cols=r_cols, repeat=repeat)
+    df = measure(results, "pipeline.clean_ingredients", clean_ingredients_column, df, repeat=repeat)
+    df = measure(results, "pipeline.format_time_columns", format_time_columns, df, repeat=repeat)
+    df = df.reset_index(drop=True)
+
+    measure(results, "pipeline.streaming_total", run_pipeline_streaming,
+            csv_path, CHUNK_SIZE, repeat=repeat)
+    return df
+
+
+def bench_indexes(results: dict, df: pd.DataFrame, repeat: int):
+    """Index et tables construits après le pipeline (snapshot exclu)."""
+    ingredient_index = measure(results, "index.ingredients", build_ingredient_index,
+                               df["ingredients"], repeat=repeat)
+    df["ingredients"] = measure(results, "index.intern_ingredients", ingredient_lists,
+                                ingredient_index, repeat=repeat)
+    name_index = measure(results, "index.names", build_name_index, df["name"], repeat=repeat)
+    text_index = measure(results, "index.fulltext", build_text_index, df, repeat=repeat)
+    range_index = measure(results, "index.ranges", build_range_index, df, repeat=repeat)
+    store = measure(results, "analysis.build_store", build_analysis_store, df, repeat=repeat)
+    return ingredient_index, name_index, text_index, range_index, store
+
+
+def bench_queries(results: dict, df, ingredient_index, name_index, text_index, range_index, repeat: int):
+    # Ingrédients fréquents et moyennement fréquents du jeu courant
+    by_freq = ingredient_index.vocab[np.argsort(-ingredient_index.frequencies, kind="stable")]
+    common = list(by_freq[:3])
+    mixed = list(by_freq[[0, 5, 20]]) if len(by_freq) > 20 else common
+
+    measure(results, "search.match_all", match_all_ingredients,
+            ingredient_index, common, repeat=repeat)
+    measure(results, "search.pantry", pantry_match,
+            ingredient_index, mixed, k=10, repeat=repeat)
+    measure(results, "search.autocomplete", suggest_ingredients,
+            ingredient_index, common[0][:2], k=50, repeat=repeat)
+    measure(results, "search.name_substring", substring_search,
+            name_index, "chicken soup", repeat=repeat)
+    measure(results, "search.name_fuzzy", fuzzy_search,
+            name_index, "chiken sop", repeat=repeat)
+    measure(results, "search.bm25", bm25_search,
+            text_index, "creamy garlic pasta", repeat=repeat)
+
+    engine = RecipeQueryEngine(df, ingredient_index, name_index, text_index, range_index)
+    queries = {
+        "engine.strict_filters": RecipeQuery(ingredients=common, max_time=60, max_calories=800, limit=None),
+        "engine.pantry_sorted": RecipeQuery(ingredients=mixed, match="pantry", max_missing=1, sort="rating"),
+        "engine.tight_calorie_cap": RecipeQuery(ingredients=common[:1], max_calories=80, limit=None),
+        "engine.nutrition_ranges": RecipeQuery(max_sugar=5, min_protein=20, max_time=30, limit=None),
+        "engine.text_and_time": RecipeQuery(text="chocolate cake", max_time=45),
+        "engine.browse_by_calories": RecipeQuery(sort="calories", limit=50),
+    }
+    for name, query in queries.items():
+        measure(results, name, engine.search, query, repeat=repeat)
+
+    everything = np.arange(len(df), dtype=np.int32)
+    measure(results, "engine.sample", engine.sample, everything, 10, 0, repeat=repeat)
+    measure(results, "engine.browse_page_50", engine.page, everything, "rating", 49, 10, repeat=repeat)
+
+
+def bench_analysis(results: dict, store, repeat: int):
+    # Les vues de la page d'analyse ne font que trancher les tables du store
+    def slices():
+        store.popular.head(20)
+        store.category_time[store.category_time["n_recipes"] >= 50]
+        store.bubble.head(400)
+        store.nutrition.head(20)
+        store.optimised.head(20)
+    measure(results, "analysis.page_slices", slices, repeat=repeat)
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Étapes dont la durée dépasse la référence de plus de `threshold`."""
+    regressions = []
+    for name, ref in baseline.get("results", {}).items():
+        cur = current["results"].get(name)
+        if cur is None or ref["seconds"] < MIN_SECONDS and cur["seconds"] < MIN_SECONDS:
+            continue
+        ratio = cur["seconds"] / max(ref["seconds"], 1e-9)
+        if ratio > 1 + threshold:
+            regressions.append({"stage": name, "baseline_s": ref["seconds"],
+                                "current_s": cur["seconds"], "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the recipe pipeline and search paths.")
+    parser.add_argument("--size", default="10k", help=f"rows, or one of {list(SIZES)}")
+    parser.add_argument("--csv", help="benchmark this CSV instead of a synthetic one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query (best time kept)")
+    parser.add_argument("--stage-repeat", type=int, default=3,
+                        help="runs per pipeline / index stage (use 1 on large sizes)")
+    parser.add_argument("--out", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown tolerated before failing (0.2 = +20%%)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the extra tracemalloc run of each stage")
+    args = parser.parse_args(argv)
+
+    global TRACE_MEMORY
+    TRACE_MEMORY = not args.no_memory
+
+    if args.csv:
+        csv_path = Path(args.csv)
+    else:
+        n = SIZES.get(args.size) or int(args.size)
+        csv_path = DATA_CACHE / f"synthetic_{n}_{args.seed}.csv"
+        if not csv_path.exists():
+            print(f"Generating {n} rows -> {csv_path}", file=sys.stderr)
+            generate_csv(csv_path, n, seed=args.seed)
+
+    results = {}
+    df = bench_pipeline(results, csv_path, args.stage_repeat)
+    ingredient_index, name_index, text_index, range_index, store = bench_indexes(results, df, args.stage_repeat)
+    bench_queries(results, df, ingredient_index, name_index, text_index, range_index, args.repeat)
+    bench_analysis(results, store, args.repeat)
+
+    report = {
+        "meta": {
+            "csv": str(csv_path),
+            "csv_bytes": csv_path.stat().st_size,
+            "recipes": len(df),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["regressions"] = compare(report, baseline, args.threshold)
+        for r in report["regressions"]:
+            print(f"REGRESSION {r['stage']}: {r['baseline_s']} s -> {r['current_s']} s "
+                  f"(x{r['ratio']})", file=sys.stderr)
+        status = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Génère un CSV synthétique au format de recipes_small.csv (colonnes Food.com,
+vecteurs R c("..."), durées ISO-8601, entités HTML, doublons de RecipeId).
+
+    python benchmarks/generer_csv.py 100k /tmp/recipes_100k.csv
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000, "5M": 5_000_000}
+
+COLUMNS = [
+    "RecipeId", "Name", "AuthorId", "AuthorName", "CookTime", "PrepTime", "TotalTime",
+    "DatePublished", "Description", "Images", "RecipeCategory", "Keywords",
+    "RecipeIngredientQuantities", "RecipeIngredientParts", "AggregatedRating",
+    "ReviewCount", "Calories", "FatContent", "SaturatedFatContent", "CholesterolContent",
+    "SodiumContent", "CarbohydrateContent", "FiberContent", "SugarContent",
+    "ProteinContent", "RecipeServings", "RecipeYield", "RecipeInstructions",
+]
+
+_BASE_INGREDIENTS = [
+    "salt", "butter", "sugar", "flour", "eggs", "milk", "garlic", "onion", "chicken",
+    "olive oil", "pepper", "water", "vanilla", "lemon juice", "rice", "beef",
+    "tomatoes", "cheddar cheese", "parsley", "&quot;heavy&quot; cream", "half &amp; half",
+]
+_WORDS = [
+    "easy", "spicy", "one", "pot", "chicken", "soup", "baked", "lemon", "garlic",
+    "quick", "creamy", "pasta", "salad", "grilled", "vegan", "chocolate", "cake",
+    "bread", "no", "oven", "slow", "cooker", "best", "ever", "mom's", "crock",
+]
+_CATEGORIES = [
+    "Dessert", "Chicken", "Beverages", "< 60 Mins", "< 30 Mins", "Breads", "Vegetable",
+    "Pork", "Lunch/Snacks", "One Dish Meal", "Breakfast", "Quick Breads",
+]
+_DURATIONS = ["PT5M", "PT10M", "PT15M", "PT30M", "PT45M", "PT1H", "PT1H30M", "PT2H",
+              "PT24H", "P1DT2H", "PT0S", "PT90S", ""]
+
+
+def _r_vector(values) -> str:
+    return "c(" + ", ".join(f'"{v}"' for v in values) + ")"
+
+
+def _chunk(rng, start: int, n: int, vocab: np.ndarray, weights: np.ndarray) -> pd.DataFrame:
+    ids = start + np.arange(n) + 1
+    # ~1 % de doublons de RecipeId (déjà vus plus tôt dans le fichier)
+    dup = rng.random(n) < 0.01
+    ids[dup] = rng.integers(1, max(start + 1, 2), dup.sum())
+
+    n_ing = rng.integers(1, 13, n)
+    ings = rng.choice(len(vocab), size=n_ing.sum(), p=weights)
+    bounds = np.concatenate([[0], np.cumsum(n_ing)])
+
+    parts, quantities, instructions, names, descriptions = [], [], [], [], []
+    words = rng.choice(_WORDS, size=(n, 6))
+    for i in range(n):
+        lst = vocab[ings[bounds[i]:bounds[i + 1]]]
+        parts.append(_r_vector(lst))
+        quantities.append(_r_vector(rng.integers(1, 5, len(lst))))
+        w = words[i]
+        names.append(f"{w[0].title()} {w[1]} {w[2]} {ids[i]}")
+        descriptions.append(f"Make this {w[3]} {w[4]} dish, {w[5]} and delicious.")
+        instructions.append(_r_vector([
+            f"Mix the {lst[0]}.", f"Cook it {w[1]} for a while.", "Serve \\\"hot\\\"."
+        ]))
+
+    def durations():
+        return rng.choice(_DURATIONS, n)
+
+    df = pd.DataFrame({
+        "RecipeId": ids,
+        "Name": names,
+        "AuthorId": rng.integers(1, 10_000, n),
+        "AuthorName": "someone",
+        "CookTime": durations(),
+        "PrepTime": durations(),
+        "TotalTime": durations(),
+        "DatePublished": "2005-01-01T00:00:00Z",
+        "Description": descriptions,
+        "Images": np.where(rng.random(n) < 0.6,
+                           [f'c("https://img.example/{i}.jpg")' for i in ids], "character(0)"),
+        "RecipeCategory": rng.choice(_CATEGORIES, n),
+        "Keywords": 'c("Easy", "Healthy")',
+        "RecipeIngredientQuantities": quantities,
+        "RecipeIngredientParts": parts,
+        "AggregatedRating": np.where(rng.random(n) < 0.3, np.nan, rng.integers(1, 11, n) / 2),
+        "ReviewCount": np.where(rng.random(n) < 0.3, np.nan, rng.zipf(1.6, n).clip(max=3000)),
+        "Calories": rng.gamma(2.0, 250.0, n).round(1),
+        "FatContent": rng.gamma(2.0, 10.0, n).round(1),
+        "SaturatedFatContent": 1.0,
+        "CholesterolContent": 1.0,
+        "SodiumContent": 1.0,
+        "CarbohydrateContent": 1.0,
+        "FiberContent": 1.0,
+        "SugarContent": rng.gamma(2.0, 10.0, n).round(1),
+        "ProteinContent": rng.gamma(2.0, 10.0, n).round(1),
+        "RecipeServings": 4,
+        "RecipeYield": "",
+        "RecipeInstructions": instructions,
+    })
+    # Quelques lignes sans description (supprimées par clean_recipe_df)
+    df.loc[rng.random(n) < 0.02, "Description"] = np.nan
+    return df[COLUMNS]
+
+
+def generate_csv(path: Path, n_rows: int, seed: int = 0, chunksize: int = 100_000) -> Path:
+    """Écrit `n_rows` recettes synthétiques dans `path` (par blocs)."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array(_BASE_INGREDIENTS + [f"ingredient {i}" for i in range(5000)], dtype=object)
+    # Fréquences en loi de Zipf, comme les vrais ingrédients
+    weights = 1.0 / np.arange(1, len(vocab) + 1)
+    weights /= weights.sum()
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    for start in range(0, n_rows, chunksize):
+        df = _chunk(rng, start, min(chunksize, n_rows - start), vocab, weights)
+        df.to_csv(tmp, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    tmp.replace(path)
+    return path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic recipes CSV.")
+    parser.add_argument("size", help=f"number of rows or one of {list(SIZES)}")
+    parser.add_argument("out", help="output CSV path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    n = SIZES.get(args.size) or int(args.size)
+    generate_csv(Path(args.out), n, seed=args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
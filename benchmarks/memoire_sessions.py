@@ -0,0 +1,73 @@
+"""
+Mémoire résidente du processus Streamlit en fonction du nombre de sessions.
+
+    python benchmarks/memoire_sessions.py --sessions 20
+    python benchmarks/memoire_sessions.py --sessions 20 --simulate-copies
+
+Chaque session est simulée avec streamlit.testing (AppTest) sur la page
+Recipes, et gardée ouverte. Avec --simulate-copies, chaque session garde en
+plus une copie désérialisée du DataFrame, comme le faisait l'ancien
+st.cache_data de app.py : c'est le point de comparaison.
+"""
+import argparse
+import gc
+import json
+import pickle
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from data_pipeline import load_dataset, load_recipes, load_query_engine  # noqa: E402
+from telemetrie import current_rss_mb  # noqa: E402
+
+
+def open_session(ingredients) -> AppTest:
+    at = AppTest.from_file(str(BASE_DIR / "app.py"), default_timeout=600).run()
+    at.sidebar.radio[0].set_value("Recipes").run()
+    at.sidebar.multiselect[0].set_value(ingredients).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure RSS growth with concurrent Streamlit sessions.")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--simulate-copies", action="store_true",
+                        help="keep one deserialized DataFrame copy per session (old behaviour)")
+    args = parser.parse_args(argv)
+
+    # Chargement partagé fait une fois, avant la première session
+    df = load_dataset()
+    frame = load_recipes() if args.simulate_copies else None
+    index = load_query_engine().ingredient_index
+    ingredients = index.vocab[index.frequencies.argsort()[::-1][:3]].tolist()
+
+    sessions, copies, rss = [], [], []
+    gc.collect()
+    base = current_rss_mb()
+    for _ in range(args.sessions):
+        sessions.append(open_session(ingredients))
+        if args.simulate_copies:
+            copies.append(pickle.loads(pickle.dumps(frame)))
+        gc.collect()
+        rss.append(round(current_rss_mb() - base, 1))
+
+    report = {
+        "recipes": len(df),
+        "simulate_copies": args.simulate_copies,
+        "base_rss_mb": round(base, 1),
+        "rss_growth_mb": rss,
+        # Pente hors première session (imports et caches de Streamlit)
+        "per_session_mb": round((rss[-1] - rss[0]) / (len(rss) - 1), 2) if len(rss) > 1 else None,
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
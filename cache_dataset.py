@@ -0,0 +1,386 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Incrémenter si le format des fichiers du snapshot change
+SNAPSHOT_FORMAT = 3
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# Modules dont le code influence le DataFrame final ou les index rangés dans
+# le snapshot : toute modification invalide les snapshots existants
+PIPELINE_MODULES = (
+    "nettoyage.py", "forme_list.py", "data_pipeline.py", "cache_dataset.py",
+    "index_ingredients.py", "ingestion_delta.py", "index_noms.py", "index_texte.py",
+    "index_plages.py",
+)
+
+# Séparateur des chaînes dans le tas d'octets (absent des textes du CSV)
+_SEP = "\x00"
+
+
+def _hash_file(path: Path, h) -> None:
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+
+
+def pipeline_version() -> str:
+    """Empreinte du code du pipeline (modules listés dans PIPELINE_MODULES)."""
+    h = hashlib.sha256(f"format={SNAPSHOT_FORMAT}".encode())
+    for name in PIPELINE_MODULES:
+        path = BASE_DIR / name
+        if path.exists():
+            _hash_file(path, h)
+    return h.hexdigest()
+
+
+def dataset_key(csv_path: Path) -> str:
+    """
+    Clé du snapshot : hash du contenu du CSV source + version du pipeline.
+    """
+    h = hashlib.sha256(pipeline_version().encode())
+    _hash_file(Path(csv_path), h)
+    return h.hexdigest()[:32]
+
+
+def delta_key(base_key: str, delta_path: Path) -> str:
+    """Clé du snapshot obtenu en appliquant un CSV delta au snapshot `base_key`."""
+    h = hashlib.sha256(base_key.encode())
+    _hash_file(Path(delta_path), h)
+    return h.hexdigest()[:32]
+
+
+# Écriture
+
+def _save_strings(dest: Path, name: str, values) -> None:
+    """
+    Écrit une suite de chaînes (éventuellement NA) :
+    - <name>.heap.npy : octets UTF-8 des chaînes séparées par \\x00
+    - <name>.offsets.npy : début de chaque chaîne dans le tas (n + 1 valeurs,
+      la chaîne i occupe heap[offsets[i]:offsets[i + 1] - 1])
+    - <name>.null.npy : masque des valeurs manquantes
+    """
+    null = np.fromiter((not isinstance(v, str) for v in values), dtype=bool, count=len(values))
+    texts = ["" if n else v for v, n in zip(values, null)]
+    if any(_SEP in t for t in texts):
+        raise ValueError(f"Column '{name}' contains NUL characters")
+    heap = np.frombuffer(_SEP.join(texts).encode("utf-8"), dtype=np.uint8)
+    # Un octet nul n'apparaît en UTF-8 que pour le séparateur
+    offsets = np.concatenate([[0], np.flatnonzero(heap == 0) + 1, [len(heap) + 1]])
+    np.save(dest / f"{name}.heap.npy", heap)
+    np.save(dest / f"{name}.offsets.npy", offsets[:len(texts) + 1].astype(np.int64))
+    np.save(dest / f"{name}.null.npy", null)
+
+
+def _column_kind(s: pd.Series) -> str:
+    if pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+        return "numeric"
+    non_null = s.dropna()
+    if len(non_null) and non_null.map(lambda v: isinstance(v, list)).all():
+        return "list"
+    if non_null.map(lambda v: isinstance(v, str)).all():
+        return "string"
+    raise TypeError(f"Unsupported column type for snapshot: {s.name}")
+
+
+def _new_tmp_dir(dest: Path) -> Path:
+    """
+    Dossier temporaire propre à cet écrivain, à côté de `dest` (même système
+    de fichiers, pour un renommage atomique).
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=dest.parent, prefix=f"{dest.name}.tmp-"))
+    os.chmod(tmp, 0o755)
+    return tmp
+
+
+def _publish(tmp: Path, dest: Path) -> bool:
+    """
+    Publie `tmp` sous le nom `dest` par un seul os.rename. Si `dest` existe
+    déjà (publié entre-temps par un autre processus à partir de la même
+    clé), cette copie est supprimée et la version publiée gardée.
+    Renvoie True si c'est cette copie qui a été publiée.
+    """
+    try:
+        os.rename(tmp, dest)
+        return True
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not dest.exists():
+            raise
+        return False
+
+
+def save_snapshot(df: pd.DataFrame, dest: Path) -> Path:
+    """
+    Écrit le DataFrame final dans un snapshot binaire colonnaire.
+
+    - colonnes numériques : un .npy par colonne
+    - colonnes texte : tas d'octets UTF-8 + masque de NA
+    - colonnes listes : offsets (int64) + codes des valeurs (int32) dans un
+      dictionnaire de valeurs distinctes (texte)
+
+    L'écriture se fait dans un dossier temporaire propre au processus,
+    renommé à la fin : jamais de snapshot à moitié écrit, même quand
+    plusieurs processus construisent la même clé en même temps (le premier
+    publié est gardé).
+    """
+    dest = Path(dest)
+    tmp = _new_tmp_dir(dest)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        s = df[col]
+        kind = _column_kind(s)
+        name = f"c{i}"
+
+        if kind == "numeric":
+            np.save(tmp / f"{name}.npy", s.to_numpy())
+        elif kind == "string":
+            _save_strings(tmp, name, s.tolist())
+        else:
+            lists = [v if isinstance(v, list) else [] for v in s]
+            lengths = np.fromiter((len(v) for v in lists), dtype=np.int64, count=len(lists))
+            offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            np.save(tmp / f"{name}.offsets.npy", offsets)
+            np.save(tmp / f"{name}.null.npy", s.isna().to_numpy())
+            codes, uniques = pd.factorize(np.array([x for v in lists for x in v], dtype=object))
+            np.save(tmp / f"{name}.codes.npy", codes.astype(np.int32))
+            _save_strings(tmp, f"{name}.values", list(uniques))
+
+        columns.append({"name": col, "file": name, "kind": kind, "dtype": str(s.dtype)})
+
+    np.save(tmp / "index.npy", df.index.to_numpy())
+    manifest = {"format": SNAPSHOT_FORMAT, "n_rows": len(df), "columns": columns}
+    (tmp / "manifest.json").write_text(json.dumps(manifest, indent=1))
+
+    # Dossier sans manifeste : artefacts écrits sans snapshot, à remplacer
+    if dest.exists() and not (dest / "manifest.json").exists():
+        shutil.rmtree(dest, ignore_errors=True)
+    _publish(tmp, dest)
+    return dest
+
+
+# Lecture
+
+def _load_strings(src: Path, name: str) -> list:
+    heap = np.load(src / f"{name}.heap.npy", mmap_mode="r")
+    null = np.load(src / f"{name}.null.npy", mmap_mode="r")
+    if len(null) == 0:
+        return []
+    texts = heap.tobytes().decode("utf-8").split(_SEP)
+    return [np.nan if n else t for t, n in zip(texts, null)]
+
+
+def _load_column(src: Path, meta: dict) -> pd.Series:
+    """Recharge une colonne du snapshot (numérique : tableau en mmap, sans copie)."""
+    name, kind = meta["file"], meta["kind"]
+
+    if kind == "numeric":
+        values = np.load(src / f"{name}.npy", mmap_mode="r")
+    elif kind == "string":
+        values = _load_strings(src, name)
+    else:
+        offsets = np.load(src / f"{name}.offsets.npy", mmap_mode="r")
+        null = np.load(src / f"{name}.null.npy", mmap_mode="r")
+        codes = np.load(src / f"{name}.codes.npy", mmap_mode="r")
+        uniques = np.array(_load_strings(src, f"{name}.values"), dtype=object)
+        # Les valeurs répétées partagent le même objet str
+        flat = uniques[codes].tolist()
+        values = [
+            np.nan if n else flat[a:b]
+            for a, b, n in zip(offsets[:-1].tolist(), offsets[1:].tolist(), null)
+        ]
+
+    s = pd.Series(values, name=meta["name"], copy=False)
+    if kind != "list" and meta["dtype"] != str(s.dtype):
+        s = s.astype(meta["dtype"])
+    return s
+
+
+def _read_manifest(src: Path) -> dict:
+    manifest = json.loads((Path(src) / "manifest.json").read_text())
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format: {manifest.get('format')}")
+    return manifest
+
+
+def load_snapshot(src: Path) -> pd.DataFrame:
+    """
+    Recharge un snapshot écrit par save_snapshot. Les colonnes numériques
+    restent des tableaux en mmap (pages partagées entre processus).
+    """
+    src = Path(src)
+    manifest = _read_manifest(src)
+    data = {meta["name"]: _load_column(src, meta) for meta in manifest["columns"]}
+    df = pd.DataFrame(data, copy=False)
+    df.index = pd.Index(np.load(src / "index.npy"))
+    return df
+
+
+class MappedStrings:
+    """
+    Chaînes d'une colonne texte lues à la demande dans le tas en mmap :
+    seules les chaînes demandées sont décodées.
+    """
+
+    def __init__(self, src: Path, name: str):
+        self.heap = np.load(src / f"{name}.heap.npy", mmap_mode="r")
+        self.offsets = np.load(src / f"{name}.offsets.npy", mmap_mode="r")
+        self.null = np.load(src / f"{name}.null.npy", mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.null)
+
+    def __getitem__(self, i: int):
+        if self.null[i]:
+            return np.nan
+        return self.heap[self.offsets[i]:self.offsets[i + 1] - 1].tobytes().decode("utf-8")
+
+    def take(self, positions) -> list:
+        return [self[i] for i in np.asarray(positions).tolist()]
+
+
+class MappedDataset:
+    """
+    Jeu de données lu directement dans les fichiers d'un snapshot (mmap),
+    sans DataFrame complet : plusieurs processus qui ouvrent le même
+    snapshot partagent les mêmes pages mémoire.
+
+    - ds["col"] : colonne entière (numérique : Series sur le mmap, sans copie ;
+      texte / listes : décodée)
+    - ds.frame(cols) : DataFrame de quelques colonnes
+    - ds.iloc[positions] / ds.take(positions) : lignes demandées seulement
+    """
+
+    def __init__(self, src: Path):
+        self.src = Path(src)
+        manifest = _read_manifest(self.src)
+        self.n_rows = manifest["n_rows"]
+        self._meta = {m["name"]: m for m in manifest["columns"]}
+        self._numeric = {}
+        self._strings = {}
+        self._lists = {}
+        for name, meta in self._meta.items():
+            f = meta["file"]
+            if meta["kind"] == "numeric":
+                self._numeric[name] = np.load(self.src / f"{f}.npy", mmap_mode="r")
+            elif meta["kind"] == "string":
+                self._strings[name] = MappedStrings(self.src, f)
+            else:
+                self._lists[name] = (
+                    np.load(self.src / f"{f}.offsets.npy", mmap_mode="r"),
+                    np.load(self.src / f"{f}.codes.npy", mmap_mode="r"),
+                    np.load(self.src / f"{f}.null.npy", mmap_mode="r"),
+                    MappedStrings(self.src, f"{f}.values"),
+                )
+
+    @property
+    def columns(self) -> list:
+        return list(self._meta)
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def __getitem__(self, col):
+        if isinstance(col, list):
+            return self.frame(col)
+        if col in self._numeric:
+            return pd.Series(self._numeric[col], name=col, copy=False)
+        return _load_column(self.src, self._meta[col])
+
+    def frame(self, columns) -> pd.DataFrame:
+        return pd.DataFrame({c: self[c] for c in columns}, copy=False)
+
+    def take(self, positions) -> pd.DataFrame:
+        """DataFrame des lignes `positions` (index = positions)."""
+        positions = np.asarray(positions, dtype=np.int64)
+        data = {}
+        for col, meta in self._meta.items():
+            if col in self._numeric:
+                data[col] = pd.Series(self._numeric[col][positions])
+            elif col in self._strings:
+                data[col] = pd.Series(self._strings[col].take(positions), dtype=object)
+            else:
+                offsets, codes, null, uniques = self._lists[col]
+                data[col] = pd.Series([
+                    np.nan if null[i] else uniques.take(codes[offsets[i]:offsets[i + 1]])
+                    for i in positions.tolist()
+                ], dtype=object)
+                continue
+            if str(data[col].dtype) != meta["dtype"]:
+                data[col] = data[col].astype(meta["dtype"])
+        df = pd.DataFrame(data)
+        df.index = pd.Index(positions)
+        return df
+
+    @property
+    def iloc(self):
+        return _MappedILoc(self)
+
+
+class _MappedILoc:
+    """ds.iloc[i] (Series d'une ligne) et ds.iloc[positions] (DataFrame)."""
+
+    def __init__(self, ds: MappedDataset):
+        self.ds = ds
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.ds.take([key]).iloc[0]
+        return self.ds.take(key)
+
+
+# Artefacts dérivés (index, vocabulaires...) rangés à côté du snapshot
+
+def save_artifact(snapshot: Path, name: str, arrays: dict) -> None:
+    """
+    Enregistre un dictionnaire de tableaux numpy dans <snapshot>/<name>/.
+    Les tableaux d'objets (str) sont écrits comme les colonnes texte.
+    """
+    dest = Path(snapshot) / name
+    tmp = _new_tmp_dir(dest)
+    for key, arr in arrays.items():
+        if arr.dtype == object:
+            _save_strings(tmp, key, arr.tolist())
+        else:
+            np.save(tmp / f"{key}.npy", arr)
+    _publish(tmp, dest)
+
+
+def load_artifact(snapshot: Path, name: str):
+    """
+    Recharge un artefact écrit par save_artifact (tableaux en mmap).
+    Renvoie None s'il n'existe pas.
+    """
+    src = Path(snapshot) / name
+    if not src.is_dir():
+        return None
+    arrays = {}
+    for path in src.glob("*.npy"):
+        key, _, suffix = path.name.partition(".")
+        if suffix == "npy":
+            arrays[key] = np.load(path, mmap_mode="r")
+        elif suffix == "heap.npy":
+            arrays[key] = np.array(_load_strings(src, key), dtype=object)
+    return arrays
+
+
+def prune_snapshots(root: Path, keep: str) -> None:
+    """
+    Supprime les anciens snapshots (tout sauf la clé courante et les
+    dossiers temporaires des processus qui l'écrivent encore).
+    """
+    if not Path(root).exists():
+        return
+    for p in Path(root).iterdir():
+        if p.is_dir() and not p.name.startswith(keep):
+            shutil.rmtree(p, ignore_errors=True)
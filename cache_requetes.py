@@ -0,0 +1,122 @@
+"""
+Cache des résultats de recherche partagé par tout le processus (sessions
+Streamlit, threads du service HTTP).
+
+Les requêtes sont normalisées avant d'être comparées : ordre et doublons des
+ingrédients, casse et espaces du texte, critères sans effet. Les résultats
+(tableaux de positions, ids, scores, en lecture seule) sont gardés dans un
+LRU borné en octets. Le cache est lié à une version du jeu de données
+(clé du snapshot) : un moteur construit sur une autre version le vide.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+
+from index_noms import normalize_name
+from index_texte import tokenize
+from moteur_recherche import RANGE_FILTERS, QueryResult, RecipeQuery, RecipeQueryEngine
+
+# Taille maximale des résultats gardés (octets)
+QUERY_CACHE_BYTES = 64 * 2**20
+
+# Un résultat plus gros que cette fraction du cache n'est pas gardé : il
+# évincerait à lui seul des dizaines de requêtes courantes
+MAX_ENTRY_FRACTION = 8
+
+# Surcoût approximatif d'une entrée (clé, objets Python)
+ENTRY_OVERHEAD = 512
+
+
+def query_key(query: RecipeQuery) -> tuple:
+    """Clé normalisée : deux requêtes de même clé ont le même résultat."""
+    data = asdict(query)
+    data["ingredients"] = tuple(sorted(set(query.ingredients)))
+    # Le moteur cherche dès que le texte n'est pas blanc, même s'il ne reste
+    # rien après normalisation ("!!!" -> aucun résultat) : ce cas a sa clé
+    data["name"] = (bool(query.name.strip()), normalize_name(query.name))
+    data["text"] = (bool(query.text.strip()), " ".join(tokenize(query.text)))
+    if not query.ingredients or query.match != "pantry":
+        data["max_missing"] = None
+    if not query.ingredients:
+        data["match"] = "all"
+    for attr in RANGE_FILTERS:
+        data[attr] = max(float(data[attr]), 0.0)
+    return tuple(sorted(data.items()))
+
+
+def _result_bytes(result: QueryResult) -> int:
+    return result.positions.nbytes + result.ids.nbytes + result.scores.nbytes + ENTRY_OVERHEAD
+
+
+class QueryCache:
+    """
+    LRU des résultats de RecipeQueryEngine.search, borné en octets.
+
+    Compteurs exportés par stats() : hits, misses, évictions, invalidations
+    (changement de version du jeu de données), taille en entrées et octets.
+    """
+
+    def __init__(self, max_bytes: int = QUERY_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.version = None
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def search(self, engine: RecipeQueryEngine, query: RecipeQuery) -> QueryResult:
+        """Résultat de engine.search(query), depuis le cache si possible."""
+        key = query_key(query)
+        with self._lock:
+            if engine.version != self.version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.nbytes = 0
+                self.version = engine.version
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        result = engine.search(query)
+        for arr in (result.positions, result.ids, result.scores):
+            arr.flags.writeable = False
+
+        size = _result_bytes(result)
+        if size > self.max_bytes // MAX_ENTRY_FRACTION:
+            return result
+
+        with self._lock:
+            if engine.version != self.version or key in self._entries:
+                return result
+            self._entries[key] = result
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self.nbytes -= _result_bytes(old)
+                self.evictions += 1
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
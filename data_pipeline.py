@@ -1,63 +1,631 @@
+import hashlib
+import json
+import os
 import pandas as pd
 import streamlit as st
+from collections import deque
+from email.utils import formatdate
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 import requests
 
-from nettoyage import clean_recipe_df
-from forme_list import apply_r_vectors, format_time_columns, clean_ingredients_column
+from nettoyage import clean_recipe_df, USEFUL_COLS, RAW_DTYPES
+from forme_list import apply_r_vectors, format_time_columns, clean_ingredients_column, detect_r_vector_columns
+from index_ingredients import IngredientIndex, build_ingredient_index, ingredient_lists
+from agregats_analyses import AnalysisStore, ANALYSIS_COLUMNS, build_analysis_store
+from index_noms import NameIndex, build_name_index
+from index_texte import TextIndex, build_text_index
+from index_plages import RangeIndex, RANGE_COLUMNS, build_range_index
+from telemetrie import IngestionReport, run_stage, timed_iter
+from cache_dataset import (
+    dataset_key, delta_key, load_snapshot, save_snapshot, prune_snapshots,
+    save_artifact, load_artifact, MappedDataset,
+)
 
 CSV_URL = "https://github.com/Justme-G/Recipe_Finder/releases/download/v1.1.0/recipes_small.csv"
 
 BASE_DIR = Path(__file__).resolve().parent
 LOCAL_REPO_CSV = BASE_DIR / "recipes_small.csv"
 
+# Empreinte SHA-256 publiée du CSV de la release (vérifiée si définie)
+CSV_SHA256 = os.environ.get("RECIPE_FINDER_CSV_SHA256")
+
+# Nombre de tentatives pour terminer un téléchargement interrompu
+DOWNLOAD_RETRIES = 5
+
 DATA_DIR = Path.home() / ".recipe_finder"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 LOCAL_DOWNLOADED = DATA_DIR / "recipes_small.csv"
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
 
+# CSV delta (ajouts, modifications, tombstones) appliqués sur le jeu en cache
+DELTA_DIR = DATA_DIR / "deltas"
+
+# Nombre de lignes du CSV lues par bloc en mode streaming (None = lecture d'un coup)
+CHUNK_SIZE = 50_000
+
+# Nombre de processus pour le prétraitement (1 = série)
+N_WORKERS = int(os.environ.get("RECIPE_FINDER_WORKERS", os.cpu_count() or 1))
+
+# En dessous de cette taille de CSV, le mode parallèle coûte plus qu'il ne rapporte
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+# Colonnes vecteurs R lues seulement dans la fiche détaillée d'une recette :
+# gardées brutes par le pipeline et parsées à l'affichage (forme_list.r_vector_list).
+# Tuple vide = parsing complet au chargement, comme avant.
+LAZY_R_COLUMNS = ("quantities", "instructions", "images")
+
+# Rapport de télémétrie de la construction, gardé dans le snapshot
+INGESTION_REPORT = "ingestion.json"
+
+# Rapport du dernier chargement fait par ce processus (voir ingestion_reports)
+_last_report: IngestionReport | None = None
 
-def download_once(url: str, dest: Path) -> Path:
-    if dest.exists() and dest.stat().st_size > 0:
-        return dest
 
-    r = requests.get(url, stream=True, timeout=120)
-    r.raise_for_status()
+def _meta_path(path: Path) -> Path:
+    """Fichier annexe des validateurs HTTP d'un téléchargement."""
+    return path.with_name(path.name + ".meta.json")
 
+
+def _read_meta(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(path: Path, meta: dict) -> None:
+    path.write_text(json.dumps(meta), encoding="utf-8")
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _fetch_to_tmp(http, url: str, tmp: Path, response=None) -> dict:
+    """
+    Télécharge `url` dans `tmp`, en reprenant là où le transfert s'est arrêté
+    (Range + If-Range : si la ressource a changé, le serveur renvoie tout).
+    `response` : réponse 200 déjà ouverte à consommer en premier.
+    Renvoie les validateurs (etag, last_modified, size).
+    """
+    tmp_meta = _meta_path(tmp)
+    meta = _read_meta(tmp_meta) if tmp.exists() else {}
+
+    for attempt in range(DOWNLOAD_RETRIES):
+        done = tmp.stat().st_size if tmp.exists() else 0
+        if response is None:
+            headers = {"Accept-Encoding": "identity"}
+            validator = meta.get("etag") or meta.get("last_modified")
+            if done and validator:
+                headers["Range"] = f"bytes={done}-"
+                headers["If-Range"] = validator
+            response = http.get(url, headers=headers, stream=True, timeout=120)
+
+        with response:
+            resumed = (
+                response.status_code == 206
+                and response.headers.get("Content-Range", "").startswith(f"bytes {done}-")
+            )
+            if response.status_code == 416 or (response.status_code == 206 and not resumed):
+                # Plage refusée ou incohérente : on repart de zéro
+                tmp.unlink(missing_ok=True)
+                meta, response = {}, None
+                continue
+            response.raise_for_status()
+
+            if not resumed:
+                meta = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "size": int(response.headers["Content-Length"])
+                    if "Content-Length" in response.headers else None,
+                }
+                _write_meta(tmp_meta, meta)
+
+            try:
+                with open(tmp, "ab" if resumed else "wb") as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        if chunk:
+                            f.write(chunk)
+            except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError):
+                # Transfert coupé : nouvelle tentative à partir de ce qui est reçu
+                if attempt == DOWNLOAD_RETRIES - 1:
+                    raise
+                response = None
+                continue
+
+        response = None
+        if meta.get("size") is None or tmp.stat().st_size == meta["size"]:
+            return meta
+
+    raise OSError(f"Download of {url} did not complete after {DOWNLOAD_RETRIES} attempts")
+
+
+def download_once(url: str, dest: Path, sha256: str | None = None,
+                  revalidate: bool = True, session=None) -> Path:
+    """
+    Télécharge `url` dans `dest`, de façon reprenable et vérifiée.
+
+    - fichier déjà présent : une requête conditionnelle (If-None-Match /
+      If-Modified-Since) ; 304 -> la copie locale est gardée. Sans réseau ou
+      en cas d'erreur serveur, la copie locale est gardée aussi.
+    - transfert interrompu : reprise sur le .tmp avec une requête Range, y
+      compris au lancement suivant
+    - sha256 : empreinte publiée ; vérifiée avant de remplacer `dest`
+      (ValueError et .tmp supprimé si elle ne correspond pas)
+    - session : objet type requests.Session (par défaut le module requests)
+
+    Les validateurs (ETag, Last-Modified) et l'empreinte sont gardés dans
+    '<dest>.meta.json'.
+    """
+    http = session or requests
     tmp = dest.with_suffix(".tmp")
-    with open(tmp, "wb") as f:
-        for chunk in r.iter_content(chunk_size=1024 * 1024):
-            if chunk:
-                f.write(chunk)
+    meta_path = _meta_path(dest)
+    response = None
+
+    if dest.exists() and dest.stat().st_size > 0:
+        meta = _read_meta(meta_path)
+        stale = sha256 is not None and meta.get("sha256") not in (None, sha256.lower())
+        if not revalidate and not stale:
+            return dest
+
+        headers = {"Accept-Encoding": "identity"}
+        if not stale:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            headers["If-Modified-Since"] = (
+                meta.get("last_modified") or formatdate(dest.stat().st_mtime, usegmt=True)
+            )
+        try:
+            response = http.get(url, headers=headers, stream=True, timeout=30)
+        except requests.RequestException:
+            return dest
+        if response.status_code == 304 or not response.ok:
+            response.close()
+            return dest
+        # Nouvelle version publiée : téléchargée en entier dans le .tmp
+        tmp.unlink(missing_ok=True)
+
+    meta = _fetch_to_tmp(http, url, tmp, response=response)
+
+    digest = file_sha256(tmp)
+    if sha256 is not None and digest != sha256.lower():
+        tmp.unlink(missing_ok=True)
+        _meta_path(tmp).unlink(missing_ok=True)
+        raise ValueError(f"Checksum mismatch for {url}: expected {sha256}, got {digest}")
 
     tmp.replace(dest)
+    _write_meta(meta_path, dict(meta, sha256=digest))
+    _meta_path(tmp).unlink(missing_ok=True)
     return dest
 
 
-@st.cache_data(show_spinner=True)
-def load_recipes() -> pd.DataFrame:
+def resolve_csv_path() -> Path:
+    """CSV source : fichier du repo en priorité, sinon release téléchargée."""
+    # 👉 priorité au fichier dans le repo s'il existe
+    if LOCAL_REPO_CSV.exists():
+        return LOCAL_REPO_CSV
+    return download_once(CSV_URL, LOCAL_DOWNLOADED, sha256=CSV_SHA256)
+
+
+def delta_files() -> list:
+    """CSV delta en attente, dans l'ordre d'application (nom de fichier)."""
+    if not DELTA_DIR.is_dir():
+        return []
+    return sorted(DELTA_DIR.glob("*.csv"))
+
+
+@lru_cache(maxsize=1)
+def dataset_keys() -> tuple:
+    """
+    Clés des snapshots successifs : CSV source seul, puis après chaque delta.
+    La dernière clé est celle du jeu de données courant.
+    """
+    keys = [dataset_key(resolve_csv_path())]
+    for path in delta_files():
+        keys.append(delta_key(keys[-1], path))
+    return tuple(keys)
+
+
+def dataset_snapshot_dir() -> Path:
+    """Dossier du snapshot pour le CSV courant, ses deltas et la version du pipeline."""
+    return SNAPSHOT_DIR / dataset_keys()[-1]
+
+
+@st.cache_resource(show_spinner=True)
+def load_recipes(chunksize: int | None = CHUNK_SIZE, workers: int = N_WORKERS) -> pd.DataFrame:
+    """
+    DataFrame de build_recipes(), partagé tel quel par toutes les sessions
+    du processus (cache_resource, pas de copie par appel) : il ne doit
+    jamais être modifié. Les pages travaillent sur des positions (df.iloc)
+    et des vues.
+    """
+    return build_recipes(chunksize, workers)
+
+
+def build_recipes(chunksize: int | None = CHUNK_SIZE, workers: int = N_WORKERS) -> pd.DataFrame:
     """
     Pipeline complet : lit, nettoie, parse, convertit.
-    Renvoie un DataFrame final et propre.
+    Renvoie un DataFrame final et propre (sans cache : voir load_recipes).
+
+    - chunksize : taille des blocs en lecture streaming (None = tout le CSV
+      d'un coup, comme avant)
+    - workers : nombre de processus pour traiter les blocs en parallèle
+      (1 = série ; ignoré pour les petits fichiers)
+
+    Les CSV delta de DELTA_DIR sont appliqués de façon incrémentale à partir
+    du dernier snapshot disponible (voir ingestion_delta).
     """
 
-    # 👉 priorité au fichier dans le repo s'il existe
-    if LOCAL_REPO_CSV.exists():
-        csv_path = LOCAL_REPO_CSV
+    global _last_report
+
+    # Snapshot déjà calculé pour ce CSV et cette version du pipeline ?
+    snapshot = dataset_snapshot_dir()
+    if (snapshot / "manifest.json").exists():
+        report = IngestionReport(source=str(snapshot), mode="snapshot")
+        df = run_stage(report, "load_snapshot", load_snapshot, snapshot)
+        report.log()
+        _last_report = report
+        return df
+
+    from ingestion_delta import DatasetState, apply_delta
+
+    # Dernier état déjà en cache (CSV source + une partie des deltas)
+    keys = dataset_keys()
+    done = [i for i, k in enumerate(keys) if (SNAPSHOT_DIR / k / "manifest.json").exists()]
+
+    if done:
+        base = SNAPSHOT_DIR / keys[done[-1]]
+        report = IngestionReport(source=str(base), mode="delta")
+        df = run_stage(report, "load_snapshot", load_snapshot, base)
+        arrays = load_artifact(base, "ingredients")
+        index = IngredientIndex(**arrays) if arrays is not None else build_ingredient_index(df["ingredients"])
+        names = load_artifact(base, "names")
+        fulltext = load_artifact(base, "fulltext")
+        state = DatasetState(
+            df, index,
+            NameIndex(**names) if names is not None else None,
+            TextIndex(**fulltext) if fulltext is not None else None,
+        )
+        pending = delta_files()[done[-1]:]
     else:
-        csv_path = download_once(CSV_URL, LOCAL_DOWNLOADED)
+        csv_path = resolve_csv_path()
+        report = IngestionReport(source=str(csv_path))
+        df = run_pipeline(csv_path, chunksize=chunksize, workers=workers, report=report)
+
+        # 5. Vocabulaire d'ingrédients interné : chaque nom d'ingrédient n'est
+        # plus stocké qu'une fois, et le CSR est gardé comme artefact
+        index = run_stage(report, "build_ingredient_index", build_ingredient_index, df["ingredients"])
+        df["ingredients"] = ingredient_lists(index)
+        state = DatasetState(df, index)
+        pending = delta_files()
+
+    # 6. Deltas : seules leurs lignes sont traitées, les index sont patchés
+    for path in pending:
+        state = apply_delta(state, path, report=report)
+
+    try:
+        run_stage(report, "save_snapshot", save_snapshot, state.df, snapshot)
+        save_artifact(snapshot, "ingredients", state.ingredient_index.to_arrays())
+        if state.name_index is not None:
+            save_artifact(snapshot, "names", state.name_index.to_arrays())
+        if state.text_index is not None:
+            save_artifact(snapshot, "fulltext", state.text_index.to_arrays())
+        report.save(snapshot / INGESTION_REPORT)
+        prune_snapshots(SNAPSHOT_DIR, keep=snapshot.name)
+    except OSError:
+        # Cache non inscriptible : on garde simplement le résultat en mémoire
+        pass
+
+    report.log()
+    _last_report = report
+    return state.df
+
+
+def ingestion_reports() -> dict:
+    """
+    Rapports de télémétrie pour le panneau de debug :
+    - "current" : chargement fait par ce processus (snapshot ou pipeline)
+    - "build" : dernière construction complète du snapshot courant
+    """
+    return {
+        "current": _last_report,
+        "build": IngestionReport.load(dataset_snapshot_dir() / INGESTION_REPORT),
+    }
+
+
+def run_pipeline(csv_path: Path, chunksize: int | None = None, workers: int = 1,
+                 report: IngestionReport | None = None) -> pd.DataFrame:
+    """
+    Lit le CSV brut et applique toutes les étapes de nettoyage/parsing.
+    - report : si fourni, reçoit les mesures de chaque étape (telemetrie)
+    """
+    if chunksize is not None:
+        if workers > 1 and Path(csv_path).stat().st_size >= PARALLEL_MIN_BYTES:
+            return run_pipeline_parallel(csv_path, chunksize, workers, report=report)
+        return run_pipeline_streaming(csv_path, chunksize, report=report)
+
+    if report is not None:
+        report.mode = "full"
 
-    df = pd.read_csv(csv_path)
+    df = run_stage(report, "read_csv", pd.read_csv, csv_path)
 
     # 1. Nettoyage
-    df = clean_recipe_df(df)
+    df = run_stage(report, "clean_recipe_df", clean_recipe_df, df)
+
+    # 2 à 4. Parsing
+    df = process_clean_chunk(df, report=report)
+
+    return df.reset_index(drop=True)
+
+
+def process_clean_chunk(df: pd.DataFrame, r_cols=None,
+                        report: IngestionReport | None = None) -> pd.DataFrame:
+    """
+    Étapes de parsing appliquées à un DataFrame déjà passé par clean_recipe_df.
+    Les colonnes de LAZY_R_COLUMNS ne sont pas parsées ici.
+    """
 
-    # 2. Parsing des vecteurs R (ingredients, quantities)
-    df = apply_r_vectors(df)
+    # 2. Parsing des vecteurs R utilisés par la recherche (ingredients)
+    if r_cols is None:
+        r_cols = detect_r_vector_columns(df)
+    r_cols = [c for c in r_cols if c not in LAZY_R_COLUMNS]
+    df = run_stage(report, "apply_r_vectors", apply_r_vectors, df, cols=r_cols)
 
     # 3. Nettoyage des noms d'ingrédients
-    df = clean_ingredients_column(df)
+    df = run_stage(report, "clean_ingredients_column", clean_ingredients_column, df)
 
     # 4. Formatage des temps + colonnes minutes
-    df = format_time_columns(df)
+    df = run_stage(report, "format_time_columns", format_time_columns, df)
 
     return df
+
+
+def read_raw_chunks(csv_path: Path, chunksize: int):
+    """Lecteur par blocs du CSV brut : colonnes utiles seulement, types explicites."""
+    return pd.read_csv(
+        csv_path,
+        usecols=lambda c: c in USEFUL_COLS,
+        dtype=RAW_DTYPES,
+        chunksize=chunksize,
+    )
+
+
+def empty_result(csv_path: Path) -> pd.DataFrame:
+    """DataFrame final vide (toutes les colonnes) quand aucune recette n'est gardée."""
+    empty = pd.read_csv(csv_path, nrows=0, usecols=lambda c: c in USEFUL_COLS, dtype=RAW_DTYPES)
+    return process_clean_chunk(clean_recipe_df(empty), r_cols=[])
+
+
+def run_pipeline_streaming(csv_path: Path, chunksize: int,
+                           report: IngestionReport | None = None) -> pd.DataFrame:
+    """
+    Ingestion en streaming : seules les colonnes utiles sont lues, avec des
+    types explicites, par blocs de `chunksize` lignes. Chaque bloc est nettoyé
+    et parsé avant la concaténation, ce qui limite le pic mémoire au bloc
+    courant + le résultat final.
+
+    Le dédoublonnage sur l'identifiant reste global : une recette déjà vue
+    dans un bloc précédent est ignorée (on garde la première, comme
+    drop_duplicates).
+    """
+    if report is not None:
+        report.mode = f"streaming (chunks of {chunksize})"
+
+    parts = []
+    seen = set()
+    r_cols = None
+
+    for chunk in timed_iter(report, "read_csv", read_raw_chunks(csv_path, chunksize)):
+        chunk = run_stage(report, "clean_recipe_df", clean_recipe_df, chunk)
+
+        key = "id" if "id" in chunk.columns else "name"
+        chunk = chunk[~chunk[key].isin(seen)]
+        seen.update(chunk[key].tolist())
+
+        if chunk.empty:
+            continue
+
+        # Colonnes vecteurs R détectées sur le premier bloc puis figées
+        if r_cols is None:
+            r_cols = detect_r_vector_columns(chunk)
+
+        parts.append(process_clean_chunk(chunk, r_cols=r_cols, report=report))
+
+    if not parts:
+        return empty_result(csv_path)
+
+    return pd.concat(parts, ignore_index=True)
+
+
+def process_raw_chunk(chunk: pd.DataFrame, r_cols):
+    """
+    Étapes 1 à 4 sur un bloc brut (exécuté dans un processus du pool).
+    Renvoie (bloc traité, rapport de télémétrie du processus pour ce bloc).
+    """
+    report = IngestionReport()
+    chunk = run_stage(report, "clean_recipe_df", clean_recipe_df, chunk)
+    return process_clean_chunk(chunk, r_cols=r_cols, report=report), report
+
+
+def run_pipeline_parallel(csv_path: Path, chunksize: int, workers: int,
+                          report: IngestionReport | None = None) -> pd.DataFrame:
+    """
+    Même résultat que run_pipeline_streaming, mais les blocs sont nettoyés et
+    parsés dans un pool de `workers` processus.
+
+    - les colonnes vecteurs R sont détectées sur le premier bloc non vide,
+      comme en série, puis imposées à tous les blocs
+    - les résultats sont récupérés dans l'ordre du fichier et dédoublonnés
+      globalement (première occurrence gardée)
+    - au plus 2 blocs par processus sont en cours, pour borner la mémoire
+    - les mesures des processus sont fusionnées dans `report` (durées cumulées)
+    """
+    if report is not None:
+        report.mode = f"parallel ({workers} workers, chunks of {chunksize})"
+
+    parts = []
+    seen = set()
+    r_cols = None
+    waiting = []
+    pending = deque()
+
+    def collect(done) -> None:
+        result, chunk_report = done
+        if report is not None:
+            report.merge(chunk_report)
+        key = "id" if "id" in result.columns else "name"
+        result = result[~result[key].isin(seen)]
+        seen.update(result[key].tolist())
+        if not result.empty:
+            parts.append(result)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in timed_iter(report, "read_csv", read_raw_chunks(csv_path, chunksize)):
+            if r_cols is None:
+                # Les blocs lus avant la détection attendent leur tour
+                waiting.append(chunk)
+                cleaned = clean_recipe_df(chunk)
+                if cleaned.empty:
+                    continue
+                r_cols = detect_r_vector_columns(cleaned)
+                to_submit, waiting = waiting, []
+            else:
+                to_submit = [chunk]
+
+            for c in to_submit:
+                pending.append(pool.submit(process_raw_chunk, c, r_cols))
+            while len(pending) >= 2 * workers:
+                collect(pending.popleft().result())
+
+        while pending:
+            collect(pending.popleft().result())
+
+    if not parts:
+        return empty_result(csv_path)
+
+    return pd.concat(parts, ignore_index=True)
+
+
+@st.cache_resource(show_spinner=True)
+def load_dataset():
+    """
+    Jeu de données des pages : MappedDataset ouvert sur le snapshot de
+    DATA_DIR. Les colonnes numériques, les tas de chaînes et les offsets
+    des listes restent dans les fichiers en mmap : tous les processus
+    Streamlit de la machine partagent les mêmes pages, et seules les lignes
+    affichées sont décodées (ds.iloc[positions]).
+
+    Sans snapshot, il est d'abord construit par build_recipes(), hors cache :
+    le DataFrame intermédiaire est libéré dès que le snapshot est écrit. Si
+    le cache n'est pas inscriptible, ce DataFrame est renvoyé à la place
+    (même interface : ds["col"], ds[cols], ds.iloc, len).
+    """
+    snapshot = dataset_snapshot_dir()
+    if not (snapshot / "manifest.json").exists():
+        df = build_recipes()
+        if not (snapshot / "manifest.json").exists():
+            return df
+    return MappedDataset(snapshot)
+
+
+@st.cache_resource(show_spinner=False)
+def load_ingredient_index() -> IngredientIndex:
+    """
+    Vocabulaire trié, fréquences, CSR recette -> ingrédients et index inversé.
+    Relu depuis le snapshot s'il existe, sinon construit à partir de
+    load_dataset() ; une seule instance par processus.
+    """
+    snapshot = dataset_snapshot_dir()
+    arrays = load_artifact(snapshot, "ingredients")
+    if arrays is not None:
+        return IngredientIndex(**arrays)
+
+    index = build_ingredient_index(load_dataset()["ingredients"])
+    try:
+        save_artifact(snapshot, "ingredients", index.to_arrays())
+    except OSError:
+        pass
+    return index
+
+
+@st.cache_resource(show_spinner=False)
+def load_name_index() -> NameIndex:
+    """Index de trigrammes des noms de recettes (snapshot ou construit)."""
+    snapshot = dataset_snapshot_dir()
+    arrays = load_artifact(snapshot, "names")
+    if arrays is not None:
+        return NameIndex(**arrays)
+
+    index = build_name_index(load_dataset()["name"])
+    try:
+        save_artifact(snapshot, "names", index.to_arrays())
+    except OSError:
+        pass
+    return index
+
+
+@st.cache_resource(show_spinner=False)
+def load_text_index() -> TextIndex:
+    """Index BM25 nom + description + étapes (snapshot ou construit)."""
+    snapshot = dataset_snapshot_dir()
+    arrays = load_artifact(snapshot, "fulltext")
+    if arrays is not None:
+        return TextIndex(**arrays)
+
+    index = build_text_index(load_dataset()[["name", "description", "instructions"]])
+    try:
+        save_artifact(snapshot, "fulltext", index.to_arrays())
+    except OSError:
+        pass
+    return index
+
+
+@st.cache_resource(show_spinner=False)
+def load_range_index() -> RangeIndex:
+    """Colonnes temps / nutrition pré-triées pour les filtres par plage (snapshot ou construit)."""
+    snapshot = dataset_snapshot_dir()
+    arrays = load_artifact(snapshot, "ranges")
+    if arrays is not None:
+        return RangeIndex(**arrays)
+
+    index = build_range_index(load_dataset()[list(RANGE_COLUMNS)])
+    try:
+        save_artifact(snapshot, "ranges", index.to_arrays())
+    except OSError:
+        pass
+    return index
+
+
+@st.cache_resource(show_spinner=False)
+def load_analysis_store() -> AnalysisStore:
+    """Tables de la page d'analyse, calculées une fois par processus."""
+    return build_analysis_store(load_dataset()[ANALYSIS_COLUMNS])
+
+
+@st.cache_resource(show_spinner=False)
+def load_query_engine():
+    """Moteur de recherche (moteur_recherche) partagé par toutes les sessions."""
+    from moteur_recherche import RecipeQueryEngine
+    return RecipeQueryEngine(load_dataset(), load_ingredient_index(), load_name_index(), load_text_index(),
+                             load_range_index(), version=dataset_snapshot_dir().name)
+
+
+@st.cache_resource(show_spinner=False)
+def load_query_cache():
+    """Cache des résultats de recherche (cache_requetes), partagé par toutes les sessions."""
+    from cache_requetes import QueryCache
+    return QueryCache()
+
+
+@st.cache_resource(show_spinner=False)
+def load_detail_cache():
+    """Cache LRU des fiches détaillées (fiches_recettes), partagé par toutes les sessions."""
+    from fiches_recettes import DetailCache
+    return DetailCache(load_query_engine())
@@ -0,0 +1,146 @@
+"""
+Fiches détaillées des recettes, indépendantes de Streamlit.
+
+Une fiche (RecipeDetail) contient tout ce que la page Recipes affiche pour
+une recette, déjà mis en forme : temps, listes parsées, valeurs
+nutritionnelles. Les fiches sont gardées dans un cache LRU borné partagé
+par toutes les sessions (DetailCache) : rouvrir ou réafficher une fiche ne
+touche plus au jeu de données.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pandas as pd
+
+from forme_list import minutes_to_hmin, r_vector_list
+
+# Nombre de fiches gardées en mémoire
+DETAIL_CACHE_SIZE = 512
+
+# Valeurs nutritionnelles affichées : (colonne, libellé, unité)
+NUTRIENTS = (
+    ("calories", "\U0001F525 Calories", " kcal"),
+    ("fat", "\U0001F951 Fat", " g"),
+    ("sugar", "\U0001F9C1 Sugar", " g"),
+    ("protein", "\U0001F357 Protein", " g"),
+)
+
+
+def format_nutrient(value, suffix: str = "") -> str:
+    """Valeur arrondie au dixième, sans décimale inutile ("N/A" si absente)."""
+    if value is None or (isinstance(value, (int, float)) and pd.isna(value)):
+        return "N/A"
+    v = round(float(value), 1)
+    if v.is_integer():
+        v = int(v)
+    return f"{v}{suffix}"
+
+
+@dataclass(frozen=True)
+class RecipeDetail:
+    """
+    Fiche prête à afficher.
+
+    - times : légende préparation / cuisson / total
+    - ingredients : liste des ingrédients (None si indisponible)
+    - quantities : paires (ingrédient, quantité), None si elles ne
+      correspondent pas aux ingrédients
+    - steps : étapes (liste vide si indisponibles)
+    - nutrition : paires (libellé, valeur formatée), dans l'ordre de NUTRIENTS
+    """
+    id: int
+    name: str
+    times: str
+    description: object
+    ingredients: tuple | None
+    quantities: tuple | None
+    steps: tuple
+    nutrition: tuple
+
+
+def build_recipe_detail(recette: pd.Series) -> RecipeDetail:
+    """Met en forme une ligne du jeu de données (df.iloc[position])."""
+    ingredients = recette["ingredients"]
+    ingredients = tuple(ingredients) if isinstance(ingredients, list) else None
+
+    # Quantités et étapes restent brutes dans le jeu partagé : parsées ici
+    quantities = r_vector_list(recette["quantities"])
+    if quantities and ingredients is not None and len(quantities) == len(ingredients):
+        quantities = tuple(zip(ingredients, quantities))
+    else:
+        quantities = None
+
+    times = (
+        f"⏱️ Preparation : {minutes_to_hmin(recette.get('prep_time_min'))} · "
+        f"Cooking : {minutes_to_hmin(recette.get('cook_time_min'))} · "
+        f"Total : {minutes_to_hmin(recette.get('total_time_min'))}"
+    )
+
+    return RecipeDetail(
+        id=int(recette["id"]),
+        name=recette["name"],
+        times=times,
+        description=recette["description"],
+        ingredients=ingredients,
+        quantities=quantities,
+        steps=tuple(r_vector_list(recette["instructions"])),
+        nutrition=tuple((label, format_nutrient(recette.get(col), unit))
+                        for col, label, unit in NUTRIENTS),
+    )
+
+
+class DetailCache:
+    """
+    Cache LRU des fiches, indexé par identifiant de recette. La position de
+    la recette est trouvée en O(1) par le moteur (positions_of) et seule sa
+    ligne est extraite du jeu de données, au premier affichage.
+
+    Partagé par les sessions Streamlit (threads) : accès sous verrou.
+    """
+
+    def __init__(self, engine, maxsize: int = DETAIL_CACHE_SIZE):
+        self.engine = engine
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, recipe_id: int) -> RecipeDetail | None:
+        """Fiche de la recette `recipe_id` (None si elle n'existe pas)."""
+        recipe_id = int(recipe_id)
+        with self._lock:
+            detail = self._entries.get(recipe_id)
+            if detail is not None:
+                self._entries.move_to_end(recipe_id)
+                self.hits += 1
+                return detail
+            self.misses += 1
+
+        pos = int(self.engine.positions_of([recipe_id])[0])
+        if pos < 0:
+            return None
+        detail = build_recipe_detail(self.engine.df.iloc[pos])
+
+        with self._lock:
+            self._entries[recipe_id] = detail
+            self._entries.move_to_end(recipe_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return detail
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
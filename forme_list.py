@@ -1,8 +1,13 @@
+from functools import lru_cache
 from html import unescape
+import logging
+import numpy as np
 import pandas as pd
 import re
 from nettoyage import clean_recipe_df
 
+logger = logging.getLogger(__name__)
+
 
 def detect_r_vector_columns(df: pd.DataFrame, n_check: int = 10):
     """
@@ -38,11 +43,93 @@ def parse_r_vector(s):
     return re.findall(r'"(.*?)"', s)
 
 
-def apply_r_vectors(df: pd.DataFrame):
+# Nombre de cellules parsées gardées en mémoire par r_vector_list
+R_VECTOR_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=R_VECTOR_CACHE_SIZE)
+def _parse_r_vector_cached(s: str) -> tuple:
+    return tuple(parse_r_vector(s))
+
+
+def r_vector_list(value) -> list:
+    """
+    Valeur d'une colonne vecteur R sous forme de liste, qu'elle ait été
+    parsée par le pipeline (liste) ou gardée brute (colonnes paresseuses,
+    voir data_pipeline.LAZY_R_COLUMNS). Le parsing d'une cellule brute n'est
+    fait qu'à la première demande, puis mémorisé.
+    """
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        return list(_parse_r_vector_cached(value))
+    return []
+
+
+# Même motif que parse_r_vector ('"(.*?)"' ne traverse pas les retours à la
+# ligne), plus un séparateur \x00 qui marque le début de chaque cellule
+_R_COLUMN_RE = re.compile(r'\x00|"[^"\x00\n]*"')
+
+
+def parse_r_vector_column(s: pd.Series):
+    """
+    Version « colonne entière » de parse_r_vector.
+
+    Toutes les cellules vecteurs R sont concaténées (séparées par \x00) et
+    parsées en une seule passe d'expression régulière.
+
+    Retour :
+    --------
+    (offsets, values)
+        offsets : np.ndarray int64 de taille len(s) + 1
+        values  : np.ndarray d'objets (str), toutes les valeurs à plat
+        Les valeurs de la ligne i sont values[offsets[i]:offsets[i + 1]].
+    """
+    n = len(s)
+    texts = s.to_numpy(dtype=object)
+    counts = np.zeros(n, dtype=np.int64)
+    values = np.empty(0, dtype=object)
+
+    is_vec = np.fromiter(
+        (isinstance(x, str) and x.lstrip().startswith("c(") for x in texts),
+        dtype=bool,
+        count=n,
+    )
+    selected = texts[is_vec]
+    if any("\x00" in t for t in selected):
+        raise ValueError(f"Column '{s.name}' contains NUL characters")
+
+    found = _R_COLUMN_RE.findall("\x00" + "\x00".join(selected))
+    if found:
+        is_sep = np.fromiter((v == "\x00" for v in found), dtype=bool, count=len(found))
+        found = np.array(found, dtype=object)
+        cell = np.cumsum(is_sep)[~is_sep] - 1
+        # On retire les guillemets autour de chaque valeur
+        values = np.array([v[1:-1] for v in found[~is_sep]], dtype=object)
+        counts[is_vec] = np.bincount(cell, minlength=len(selected))
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, values
+
+
+def offsets_to_lists(offsets: np.ndarray, values: np.ndarray) -> list:
+    """Reconstruit une liste Python par ligne à partir de (offsets, values)."""
+    values = values.tolist()
+    return [values[a:b] for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def apply_r_vectors(df: pd.DataFrame, cols=None):
+    """
+    Parse les colonnes vecteurs R en listes Python.
+    - cols : colonnes à parser (par défaut, détectées avec detect_r_vector_columns)
+    """
     df = df.copy()
-    cols = detect_r_vector_columns(df)
+    if cols is None:
+        cols = detect_r_vector_columns(df)
     for col in cols:
-        df[col] = df[col].apply(parse_r_vector)
+        offsets, values = parse_r_vector_column(df[col])
+        df[col] = pd.Series(offsets_to_lists(offsets, values), index=df.index, dtype=object)
     return df
 
 
@@ -128,18 +215,70 @@ def hmin_to_minutes(txt: str) -> int:
     m = re.search(r"(\d+)\s*MIN", txt)
     return (int(h.group(1)) if h else 0) * 60 + (int(m.group(1)) if m else 0)
 
+# Même grammaire que iso8601_to_hmin, avec un groupe englobant pour savoir
+# si la valeur a été reconnue (même quand toutes les parties sont absentes)
+_ISO_DURATION_PATTERN = r"^(P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)$"
+
+
+def iso8601_to_minutes_column(s: pd.Series):
+    """
+    Décode une colonne de durées ISO-8601 directement en minutes
+    (un seul str.extract pour toute la colonne).
+
+    Retour :
+    --------
+    (minutes, invalid)
+        minutes : np.ndarray int64 (0 pour les valeurs vides ou invalides)
+        invalid : masque booléen des valeurs non vides non reconnues
+    """
+    txt = s.astype(object).where(s.notna(), "").astype(str).str.strip().str.upper()
+    parts = txt.str.extract(_ISO_DURATION_PATTERN)
+
+    matched = parts[0].notna().to_numpy()
+    invalid = ~matched & (txt != "").to_numpy()
+
+    nums = parts.iloc[:, 1:].astype(float).fillna(0).to_numpy(dtype=np.int64)
+    days, hours, mins, secs = nums.T
+    minutes = (days * 24 + hours) * 60 + mins + secs // 60
+    return minutes, invalid
+
+
+def minutes_to_hmin(minutes, zero_as="0Min") -> str:
+    """
+    Rendu texte d'une durée en minutes ('24H45Min', '24H', '45Min'),
+    même format que iso8601_to_hmin. À appeler seulement pour les recettes
+    affichées.
+    """
+    if minutes is None or pd.isna(minutes):
+        return zero_as
+    hours, mins = divmod(int(minutes), 60)
+    if hours and mins:
+        return f"{hours}H{mins}Min"
+    if hours:
+        return f"{hours}H"
+    if mins:
+        return f"{mins}Min"
+    return zero_as
+
+
 # 2) Application à plusieurs colonnes du DataFrame
 def format_time_columns(df: pd.DataFrame,
                         cols=("cook_time", "prep_time", "total_time")):
     """
-    Formate les colonnes ISO-8601 en texte '...H...Min'.
-    Optionnel : ajoute aussi des colonnes numériques en minutes pour trier/filtrer.
+    Ajoute les colonnes numériques en minutes ('<col>_min') pour trier/filtrer.
+    Les colonnes ISO-8601 d'origine sont gardées telles quelles : le texte
+    '...H...Min' se calcule à l'affichage avec minutes_to_hmin.
+    Les valeurs non reconnues valent 0 et sont signalées dans les logs.
     """
     df = df.copy()
     for c in cols:
         if c in df.columns:
-            df[c] = df[c].apply(iso8601_to_hmin)
-            df[f"{c}_min"] = df[c].apply(hmin_to_minutes)
+            minutes, invalid = iso8601_to_minutes_column(df[c])
+            df[f"{c}_min"] = minutes
+            if invalid.any():
+                examples = df[c][invalid].unique()[:5].tolist()
+                logger.warning(
+                    "%d unparseable ISO-8601 durations in '%s' (e.g. %s)",
+                    int(invalid.sum()), c, examples,
+                )
     return df
-
-
@@ -0,0 +1,303 @@
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class IngredientIndex:
+    """
+    Ingrédients internés en entiers + index inversé.
+
+    - vocab : vocabulaire trié (np.ndarray d'objets str), id = position
+    - frequencies : nombre de recettes contenant chaque ingrédient
+    - offsets / ids : CSR recette -> ingrédients (int32), les ids de la
+      recette i sont ids[offsets[i]:offsets[i + 1]] (même ordre que la liste)
+    - posting_offsets / postings : CSR ingrédient -> positions des recettes,
+      triées et sans doublon (int32)
+    """
+    vocab: np.ndarray
+    frequencies: np.ndarray
+    offsets: np.ndarray
+    ids: np.ndarray
+    posting_offsets: np.ndarray
+    postings: np.ndarray
+
+    @property
+    def n_recipes(self) -> int:
+        return len(self.offsets) - 1
+
+    @cached_property
+    def n_distinct(self) -> np.ndarray:
+        """Nombre d'ingrédients distincts de chaque recette."""
+        return np.bincount(self.postings, minlength=self.n_recipes)
+
+    def ingredient_id(self, name: str) -> int:
+        """Id d'un ingrédient dans le vocabulaire, -1 s'il est inconnu."""
+        i = int(np.searchsorted(self.vocab, name))
+        if i < len(self.vocab) and self.vocab[i] == name:
+            return i
+        return -1
+
+    def recipes_with(self, ingredient_id: int) -> np.ndarray:
+        """Positions des recettes contenant l'ingrédient (liste triée)."""
+        a, b = self.posting_offsets[ingredient_id], self.posting_offsets[ingredient_id + 1]
+        return self.postings[a:b]
+
+    @cached_property
+    def prefix_index(self) -> "PrefixIndex":
+        """Index d'autocomplétion, construit une fois par index."""
+        return build_prefix_index(self)
+
+    def to_arrays(self) -> dict:
+        return {
+            "vocab": self.vocab,
+            "frequencies": self.frequencies,
+            "offsets": self.offsets,
+            "ids": self.ids,
+            "posting_offsets": self.posting_offsets,
+            "postings": self.postings,
+        }
+
+
+def build_ingredient_index(ingredients: pd.Series) -> IngredientIndex:
+    """
+    Interne la colonne 'ingredients' (listes de str) dans un vocabulaire
+    entier et construit les deux CSR (recette -> ingrédients et
+    ingrédient -> recettes).
+    """
+    lists = [lst if isinstance(lst, list) else [] for lst in ingredients]
+    lengths = np.fromiter((len(lst) for lst in lists), dtype=np.int64, count=len(lists))
+    offsets = np.zeros(len(lists) + 1, dtype=np.int32)
+    np.cumsum(lengths, out=offsets[1:])
+
+    flat = np.array([ing for lst in lists for ing in lst], dtype=object)
+    vocab, ids = np.unique(flat, return_inverse=True)
+    ids = ids.astype(np.int32).ravel()
+
+    # Index inversé : tri par (ingrédient, recette) puis suppression des
+    # doublons (un même ingrédient listé deux fois dans une recette)
+    rows = np.repeat(np.arange(len(lists), dtype=np.int32), lengths)
+    order = np.lexsort((rows, ids))
+    codes, rows = ids[order], rows[order]
+    keep = np.ones(len(codes), dtype=bool)
+    keep[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+    codes, postings = codes[keep], rows[keep]
+
+    posting_offsets = np.searchsorted(codes, np.arange(len(vocab) + 1)).astype(np.int32)
+    frequencies = np.diff(posting_offsets).astype(np.int64)
+
+    return IngredientIndex(
+        vocab=vocab,
+        frequencies=frequencies,
+        offsets=offsets,
+        ids=ids,
+        posting_offsets=posting_offsets,
+        postings=postings,
+    )
+
+
+def patch_ingredient_index(index: IngredientIndex, keep: np.ndarray, new_ingredients) -> IngredientIndex:
+    """
+    Index mis à jour sans tout reconstruire :
+    - keep : masque des recettes actuelles gardées (les autres sont retirées)
+    - new_ingredients : listes d'ingrédients des recettes ajoutées en fin
+
+    Seules les nouvelles recettes sont internées. Les listes existantes sont
+    filtrées et renumérotées, puis fusionnées avec celles des ajouts (les
+    ingrédients qui ne sont plus utilisés sortent du vocabulaire). Le
+    résultat est identique à build_ingredient_index sur le jeu complet.
+    """
+    delta = build_ingredient_index(pd.Series(list(new_ingredients), dtype=object))
+    n_kept = int(keep.sum())
+    remap = (np.cumsum(keep) - 1).astype(np.int32)
+
+    # Vocabulaire fusionné : ids anciens / nouveaux -> ids fusionnés
+    vocab = np.union1d(index.vocab, delta.vocab)
+    old_map = np.searchsorted(vocab, index.vocab).astype(np.int32)
+    new_map = np.searchsorted(vocab, delta.vocab).astype(np.int32)
+
+    # CSR recette -> ingrédients : recettes gardées puis ajouts
+    lengths = np.concatenate([np.diff(index.offsets)[keep], np.diff(delta.offsets)])
+    ids = np.concatenate([
+        old_map[index.ids[np.repeat(keep, np.diff(index.offsets))]],
+        new_map[delta.ids],
+    ])
+
+    # Index inversé : les deux parties sont déjà triées par (ingrédient,
+    # recette) et les ajouts ont les plus grandes positions, un tri stable
+    # sur l'ingrédient suffit (fusion de deux suites triées)
+    alive = keep[index.postings]
+    codes = np.concatenate([
+        np.repeat(old_map, np.diff(index.posting_offsets))[alive],
+        np.repeat(new_map, np.diff(delta.posting_offsets)),
+    ])
+    rows = np.concatenate([remap[index.postings[alive]], delta.postings + n_kept]).astype(np.int32)
+    order = np.argsort(codes, kind="stable")
+    codes, postings = codes[order], rows[order]
+
+    # Ingrédients qui ne sont plus dans aucune recette
+    used = np.bincount(codes, minlength=len(vocab)) > 0
+    compact = (np.cumsum(used) - 1).astype(np.int32)
+    vocab, codes, ids = vocab[used], compact[codes], compact[ids]
+
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int32)
+    np.cumsum(lengths, out=offsets[1:])
+    posting_offsets = np.searchsorted(codes, np.arange(len(vocab) + 1)).astype(np.int32)
+
+    return IngredientIndex(
+        vocab=vocab,
+        frequencies=np.diff(posting_offsets).astype(np.int64),
+        offsets=offsets,
+        ids=ids.astype(np.int32),
+        posting_offsets=posting_offsets,
+        postings=postings,
+    )
+
+
+# Nombre de suggestions par défaut de l'autocomplétion
+SUGGESTIONS = 20
+
+
+@dataclass
+class PrefixIndex:
+    """
+    Autocomplétion des ingrédients : les noms en minuscules, triés, forment
+    pour chaque préfixe une plage contiguë trouvée par recherche dichotomique.
+
+    - keys : noms en minuscules, triés
+    - ids : id dans le vocabulaire de chaque clé
+    - frequencies : fréquence de chaque clé
+    - by_frequency : ids du vocabulaire par fréquence décroissante (préfixe vide)
+    """
+    keys: np.ndarray
+    ids: np.ndarray
+    frequencies: np.ndarray
+    by_frequency: np.ndarray
+
+
+def build_prefix_index(index: IngredientIndex) -> PrefixIndex:
+    lower = np.array([name.lower() for name in index.vocab.tolist()], dtype=object)
+    order = np.argsort(lower, kind="stable")
+    return PrefixIndex(
+        keys=lower[order],
+        ids=order.astype(np.int32),
+        frequencies=index.frequencies[order],
+        by_frequency=np.argsort(-index.frequencies, kind="stable"),
+    )
+
+
+def suggest_ingredients(index: IngredientIndex, prefix: str, k: int = SUGGESTIONS) -> list:
+    """
+    Les k ingrédients les plus fréquents qui commencent par `prefix` (sans
+    tenir compte de la casse), du plus fréquent au moins fréquent. Seule la
+    plage du préfixe est classée, par sélection partielle.
+    """
+    prefix = prefix.strip().lower()
+    pi = index.prefix_index
+    if not prefix:
+        return index.vocab[pi.by_frequency[:k]].tolist()
+
+    lo = int(np.searchsorted(pi.keys, prefix))
+    hi = int(np.searchsorted(pi.keys, prefix + "\U0010ffff"))
+    freq = pi.frequencies[lo:hi]
+    top = np.argpartition(-freq, k - 1)[:k] if len(freq) > k else np.arange(len(freq))
+    # Fréquence décroissante, puis ordre alphabétique
+    top = top[np.lexsort((top, -freq[top]))]
+    return index.vocab[pi.ids[lo + top]].tolist()
+
+
+def ingredient_lists(index: IngredientIndex) -> list:
+    """
+    Reconstruit une liste d'ingrédients par recette à partir du CSR.
+    Les chaînes sont celles du vocabulaire : "salt" n'existe qu'une fois en
+    mémoire, quel que soit le nombre de recettes qui l'utilisent.
+    """
+    values = index.vocab[index.ids].tolist()
+    bounds = index.offsets.tolist()
+    return [values[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def match_all_ingredients(index: IngredientIndex, ingredients) -> np.ndarray:
+    """
+    Renvoie les positions des recettes contenant TOUS les ingrédients donnés.
+
+    Les listes sont intersectées de la plus rare à la plus fréquente,
+    ce qui garde les résultats intermédiaires les plus petits possible.
+    """
+    postings = []
+    for ing in set(ingredients):
+        i = index.ingredient_id(ing)
+        if i < 0:
+            return np.empty(0, dtype=np.int32)
+        postings.append(index.recipes_with(i))
+
+    if not postings:
+        return np.empty(0, dtype=np.int32)
+
+    postings.sort(key=len)
+    result = postings[0]
+    for lst in postings[1:]:
+        if len(result) == 0:
+            break
+        result = np.intersect1d(result, lst, assume_unique=True)
+    return result
+
+
+# Poids d'un ingrédient manquant face à un ingrédient utilisé (mode classé)
+MISSING_WEIGHT = 0.25
+
+
+def pantry_match(index: IngredientIndex, ingredients, k: int = 10,
+                 max_missing: int | None = None, allowed=None):
+    """
+    Mode « garde-manger » : classe les recettes selon le nombre d'ingrédients
+    choisis qu'elles utilisent et le peu d'ingrédients qui manquent.
+
+    score = utilisés - MISSING_WEIGHT * manquants
+
+    Tout le calcul est fait en une fois sur les listes de l'index inversé
+    (seules les recettes qui utilisent au moins un ingrédient sont touchées),
+    puis le top-k est choisi par sélection partielle (argpartition).
+
+    Paramètres :
+    ------------
+    max_missing : nombre maximal d'ingrédients manquants (None = pas de limite)
+    allowed : fonction optionnelle positions -> masque booléen des recettes
+      autorisées (autres filtres), appelée avant la sélection du top-k sur
+      les seules recettes qui utilisent un ingrédient
+
+    Retour :
+    --------
+    (positions, used, missing), triés par score décroissant
+    """
+    ids = {index.ingredient_id(ing) for ing in ingredients} - {-1}
+    empty = np.empty(0, dtype=np.int32)
+    if not ids:
+        return empty, empty, empty
+
+    rows, used = np.unique(
+        np.concatenate([index.recipes_with(i) for i in ids]),
+        return_counts=True,
+    )
+    missing = index.n_distinct[rows] - used
+
+    if max_missing is not None:
+        keep = missing <= max_missing
+        rows, used, missing = rows[keep], used[keep], missing[keep]
+    if allowed is not None:
+        keep = allowed(rows)
+        rows, used, missing = rows[keep], used[keep], missing[keep]
+
+    scores = used - MISSING_WEIGHT * missing
+    if len(rows) > k:
+        # k-ième meilleur score, puis égalités départagées par position
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[: k - len(above)]
+        top = np.concatenate([above, ties])
+        rows, used, missing, scores = rows[top], used[top], missing[top], scores[top]
+
+    order = np.lexsort((rows, -scores))
+    return rows[order], used[order], missing[order]
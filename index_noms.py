@@ -0,0 +1,222 @@
+import re
+import unicodedata
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Recherche approchée : part minimale des trigrammes de la requête présents
+# dans le nom, et poids de la part du nom non couverte dans le classement
+FUZZY_MIN_COVERAGE = 0.5
+LENGTH_PENALTY = 0.1
+
+
+def normalize_name(s: object) -> str:
+    """
+    Normalise un nom de recette pour la recherche :
+    minuscules, accents retirés, ponctuation remplacée par des espaces.
+    """
+    if not isinstance(s, str):
+        return ""
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(c for c in s if not unicodedata.combining(c))
+    return re.sub(r"[\W_]+", " ", s.lower()).strip()
+
+
+def _codes(text: str) -> np.ndarray:
+    """Points de code Unicode du texte (int64)."""
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+
+
+def _trigrams(codes: np.ndarray) -> np.ndarray:
+    """Trigrammes encodés en un entier (3 x 21 bits) pour chaque position."""
+    return (codes[:-2] << 42) | (codes[1:-1] << 21) | codes[2:]
+
+
+def query_trigrams(text: str) -> np.ndarray:
+    """Trigrammes distincts d'un texte déjà normalisé."""
+    if len(text) < 3:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(_trigrams(_codes(text)))
+
+
+@dataclass
+class NameIndex:
+    """
+    Index de trigrammes de caractères sur les noms normalisés.
+
+    - names : noms normalisés (np.ndarray d'objets str), par position de recette
+    - grams : trigrammes distincts (int64, triés)
+    - posting_offsets / postings : CSR trigramme -> positions des recettes
+    - n_grams : nombre de trigrammes distincts de chaque nom
+    """
+    names: np.ndarray
+    grams: np.ndarray
+    posting_offsets: np.ndarray
+    postings: np.ndarray
+    n_grams: np.ndarray
+
+    def recipes_with(self, gram: int) -> np.ndarray:
+        i = int(np.searchsorted(self.grams, gram))
+        if i == len(self.grams) or self.grams[i] != gram:
+            return np.empty(0, dtype=np.int32)
+        return self.postings[self.posting_offsets[i]:self.posting_offsets[i + 1]]
+
+    def to_arrays(self) -> dict:
+        return {
+            "names": self.names,
+            "grams": self.grams,
+            "posting_offsets": self.posting_offsets,
+            "postings": self.postings,
+            "n_grams": self.n_grams,
+        }
+
+
+def build_name_index(names: pd.Series) -> NameIndex:
+    """
+    Construit l'index de trigrammes. Chaque nom est entouré d'un espace
+    (' nom ') pour que les débuts / fins de mots aient leurs trigrammes.
+    Tous les noms sont traités en une passe numpy (séparés par \\x00).
+    """
+    norm = np.array([normalize_name(n) for n in names], dtype=object)
+    n = len(norm)
+
+    codes = _codes("\x00".join(" " + x + " " for x in norm))
+    if len(codes) < 3:
+        return NameIndex(norm, np.empty(0, np.int64), np.zeros(1, np.int32),
+                         np.empty(0, np.int32), np.zeros(n, np.int32))
+
+    grams = _trigrams(codes)
+    rows = np.cumsum(codes == 0)[:-2].astype(np.int32)
+    valid = (codes[:-2] != 0) & (codes[1:-1] != 0) & (codes[2:] != 0)
+    grams, rows = grams[valid], rows[valid]
+
+    # Paires (trigramme, recette) distinctes, triées
+    order = np.lexsort((rows, grams))
+    grams, rows = grams[order], rows[order]
+    keep = np.ones(len(grams), dtype=bool)
+    keep[1:] = (grams[1:] != grams[:-1]) | (rows[1:] != rows[:-1])
+    grams, rows = grams[keep], rows[keep]
+
+    vocab = np.unique(grams)
+    posting_offsets = np.append(np.searchsorted(grams, vocab), len(grams))
+
+    return NameIndex(
+        names=norm,
+        grams=vocab,
+        posting_offsets=posting_offsets.astype(np.int32),
+        postings=rows,
+        n_grams=np.bincount(rows, minlength=n).astype(np.int32),
+    )
+
+
+def patch_name_index(index: NameIndex, keep: np.ndarray, new_names) -> NameIndex:
+    """
+    Index mis à jour sans tout reconstruire : recettes `keep` gardées (et
+    renumérotées), puis `new_names` ajoutés en fin. Seuls les nouveaux noms
+    sont découpés en trigrammes.
+    """
+    delta = build_name_index(new_names)
+    n_kept = int(keep.sum())
+    remap = (np.cumsum(keep) - 1).astype(np.int32)
+
+    # Paires (trigramme, recette) : gardées puis ajoutées, deux suites déjà
+    # triées que le tri stable fusionne
+    alive = keep[index.postings]
+    grams = np.concatenate([
+        np.repeat(index.grams, np.diff(index.posting_offsets))[alive],
+        np.repeat(delta.grams, np.diff(delta.posting_offsets)),
+    ])
+    rows = np.concatenate([remap[index.postings[alive]], delta.postings + n_kept]).astype(np.int32)
+    order = np.argsort(grams, kind="stable")
+    grams, rows = grams[order], rows[order]
+
+    first = np.ones(len(grams), dtype=bool)
+    first[1:] = grams[1:] != grams[:-1]
+    vocab = grams[first]
+    posting_offsets = np.append(np.flatnonzero(first), len(grams))
+
+    return NameIndex(
+        names=np.concatenate([index.names[keep], delta.names]),
+        grams=vocab,
+        posting_offsets=posting_offsets.astype(np.int32),
+        postings=rows,
+        n_grams=np.concatenate([index.n_grams[keep], delta.n_grams]).astype(np.int32),
+    )
+
+
+def substring_search(index: NameIndex, query: str, k: int = 20) -> np.ndarray:
+    """
+    Recettes dont le nom contient `query` (après normalisation).
+
+    Les listes des trigrammes de la requête sont intersectées (plus rare en
+    premier), puis les candidats sont vérifiés sur le texte. Classement :
+    noms qui commencent par la requête, puis noms les plus courts.
+    """
+    q = normalize_name(query)
+    if not q:
+        return np.empty(0, dtype=np.int32)
+
+    if len(q) < 3:
+        # Trop court pour les trigrammes : parcours des noms
+        candidates = np.flatnonzero([q in name for name in index.names])
+    else:
+        postings = sorted((index.recipes_with(g) for g in query_trigrams(q)), key=len)
+        candidates = postings[0]
+        for lst in postings[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, lst, assume_unique=True)
+        names = index.names[candidates]
+        candidates = candidates[np.fromiter((q in name for name in names), dtype=bool, count=len(names))]
+
+    names = index.names[candidates]
+    prefix = np.fromiter((name.startswith(q) for name in names), dtype=bool, count=len(names))
+    lengths = np.fromiter((len(name) for name in names), dtype=np.int64, count=len(names))
+    order = np.lexsort((candidates, lengths, ~prefix))
+    return candidates[order[:k]]
+
+
+def fuzzy_search(index: NameIndex, query: str, k: int = 20, min_score: float = FUZZY_MIN_COVERAGE):
+    """
+    Recherche tolérante aux fautes : classement par recouvrement de
+    trigrammes. Le seuil porte sur la part des trigrammes de la requête
+    présents dans le nom (une requête courte reste trouvable dans un nom
+    long) ; à recouvrement égal, les noms les plus courts passent devant
+    (pénalité LENGTH_PENALTY sur la part du nom non couverte).
+
+    Retour :
+    --------
+    (positions, scores) des k meilleurs candidats, scores décroissants.
+    """
+    q = normalize_name(query)
+    grams = query_trigrams(" " + q + " ") if q else np.empty(0, dtype=np.int64)
+    postings = [index.recipes_with(g) for g in grams]
+    postings = [p for p in postings if len(p)]
+    if not postings:
+        return np.empty(0, dtype=np.int32), np.empty(0)
+
+    rows, shared = np.unique(np.concatenate(postings), return_counts=True)
+    coverage = shared / len(grams)
+
+    keep = coverage >= min_score
+    rows, shared, coverage = rows[keep], shared[keep], coverage[keep]
+    scores = coverage - LENGTH_PENALTY * (1 - shared / np.maximum(index.n_grams[rows], 1))
+    if len(rows) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+        rows, scores = rows[top], scores[top]
+    order = np.lexsort((rows, -scores))
+    return rows[order], scores[order]
+
+
+def search_names(index: NameIndex, query: str, k: int = 20) -> np.ndarray:
+    """
+    Top-k des recettes pour une recherche par nom : correspondances exactes
+    (sous-chaîne) d'abord, complétées par les correspondances approchées.
+    """
+    exact = substring_search(index, query, k)
+    if len(exact) >= k:
+        return exact
+    fuzzy, _ = fuzzy_search(index, query, k)
+    fuzzy = fuzzy[~np.isin(fuzzy, exact)]
+    return np.concatenate([exact, fuzzy])[:k].astype(np.int32)
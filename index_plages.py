@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Colonnes numériques filtrables par plage (temps total + nutrition)
+RANGE_COLUMNS = ("total_time_min", "calories", "fat", "sugar", "protein")
+
+
+@dataclass
+class RangeIndex:
+    """
+    Colonnes numériques pré-triées : un filtre « valeur entre lo et hi »
+    devient une plage contiguë de la permutation de tri, trouvée par
+    recherche dichotomique (taille exacte en O(log n), sans masque).
+
+    - columns : noms des colonnes indexées (np.ndarray d'objets str)
+    - values : valeurs triées de chaque colonne (float64, une ligne par
+      colonne, NaN en fin)
+    - order : permutation de tri de chaque colonne (int32) : values[c, j]
+      est la valeur de la recette order[c, j]
+    """
+    columns: np.ndarray
+    values: np.ndarray
+    order: np.ndarray
+
+    def column(self, name: str) -> int:
+        """Ligne de la colonne `name` dans values / order."""
+        return self.columns.tolist().index(name)
+
+    def bounds(self, name: str, lo: float = -np.inf, hi: float = np.inf) -> tuple:
+        """Plage [a, b) de la permutation des recettes avec lo <= valeur <= hi."""
+        values = self.values[self.column(name)]
+        a = int(np.searchsorted(values, lo, side="left"))
+        b = int(np.searchsorted(values, hi, side="right"))
+        return a, max(a, b)
+
+    def count(self, name: str, lo: float = -np.inf, hi: float = np.inf) -> int:
+        """Nombre de recettes avec lo <= valeur <= hi (NaN exclus)."""
+        a, b = self.bounds(name, lo, hi)
+        return b - a
+
+    def positions(self, name: str, lo: float = -np.inf, hi: float = np.inf) -> np.ndarray:
+        """Positions (triées) des recettes avec lo <= valeur <= hi."""
+        a, b = self.bounds(name, lo, hi)
+        return np.sort(self.order[self.column(name), a:b])
+
+    def to_arrays(self) -> dict:
+        return {"columns": self.columns, "values": self.values, "order": self.order}
+
+
+def build_range_index(df: pd.DataFrame, columns=RANGE_COLUMNS) -> RangeIndex:
+    """Trie une fois chacune des colonnes présentes dans `df`."""
+    columns = [c for c in columns if c in df.columns]
+    n = len(df)
+    values = np.empty((len(columns), n), dtype=np.float64)
+    order = np.empty((len(columns), n), dtype=np.int32)
+    for c, col in enumerate(columns):
+        v = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        order[c] = np.argsort(v, kind="stable")
+        values[c] = v[order[c]]
+    return RangeIndex(columns=np.array(columns, dtype=object), values=values, order=order)
@@ -0,0 +1,221 @@
+import re
+import unicodedata
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from forme_list import parse_r_vector
+
+# Paramètres classiques de BM25
+K1 = 1.2
+B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: object) -> list:
+    """Découpe un texte en mots : minuscules, sans accents ni ponctuation."""
+    if not isinstance(text, str):
+        return []
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(text)
+
+
+def recipe_text(name: object, description: object, instructions: object) -> str:
+    """
+    Texte indexé d'une recette : nom + description + étapes.
+    Les étapes peuvent être une liste ou le vecteur R brut (colonne
+    paresseuse), parsé ici de la même façon que par le pipeline.
+    """
+    if isinstance(instructions, str):
+        instructions = parse_r_vector(instructions)
+    if isinstance(instructions, list):
+        instructions = " ".join(instructions)
+    parts = (name, description, instructions)
+    return " ".join(p for p in parts if isinstance(p, str))
+
+
+@dataclass
+class TextIndex:
+    """
+    Index inversé BM25 sur nom + description + étapes.
+
+    - vocab : mots triés (np.ndarray d'objets str), id = position
+    - posting_offsets / postings / tfs : CSR mot -> (recette, fréquence du mot)
+    - doc_len : nombre de mots de chaque recette
+    - term_max : contribution BM25 maximale de chaque mot (borne pour l'élagage)
+    """
+    vocab: np.ndarray
+    posting_offsets: np.ndarray
+    postings: np.ndarray
+    tfs: np.ndarray
+    doc_len: np.ndarray
+    term_max: np.ndarray
+    avgdl: float = field(init=False)
+
+    def __post_init__(self):
+        self.avgdl = max(float(self.doc_len.mean()), 1.0) if len(self.doc_len) else 1.0
+
+    def term_id(self, word: str) -> int:
+        i = int(np.searchsorted(self.vocab, word))
+        if i < len(self.vocab) and self.vocab[i] == word:
+            return i
+        return -1
+
+    def contributions(self, term_id: int):
+        """(recettes, scores BM25) pour un mot."""
+        a, b = self.posting_offsets[term_id], self.posting_offsets[term_id + 1]
+        docs = self.postings[a:b]
+        return docs, _bm25(len(self.doc_len), b - a, self.tfs[a:b], self.doc_len[docs], self.avgdl)
+
+    def to_arrays(self) -> dict:
+        return {
+            "vocab": self.vocab,
+            "posting_offsets": self.posting_offsets,
+            "postings": self.postings,
+            "tfs": self.tfs,
+            "doc_len": self.doc_len,
+            "term_max": self.term_max,
+        }
+
+
+def _bm25(n_docs, df, tf, dl, avgdl):
+    """Contribution BM25 d'un mot (df = nombre de recettes qui le contiennent)."""
+    idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+    tf = np.asarray(tf, dtype=np.float64)
+    return idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * dl / avgdl))
+
+
+def build_text_index(df: pd.DataFrame) -> TextIndex:
+    """Construit l'index BM25 à partir du DataFrame final du pipeline."""
+    docs = [
+        tokenize(recipe_text(n, d, i))
+        for n, d, i in zip(df["name"], df["description"], df["instructions"])
+    ]
+    doc_len = np.fromiter((len(t) for t in docs), dtype=np.int32, count=len(docs))
+    flat = np.array([w for t in docs for w in t], dtype=object)
+    rows = np.repeat(np.arange(len(docs), dtype=np.int64), doc_len)
+
+    vocab, terms = np.unique(flat, return_inverse=True)
+    terms = terms.ravel().astype(np.int64)
+
+    # Fréquence de chaque (mot, recette), triée par mot puis recette
+    pairs, tfs = np.unique(terms * len(docs) + rows, return_counts=True)
+    terms, postings = np.divmod(pairs, max(len(docs), 1))
+    posting_offsets = np.append(np.searchsorted(terms, np.arange(len(vocab))), len(terms))
+
+    return TextIndex(
+        vocab=vocab,
+        posting_offsets=posting_offsets.astype(np.int64),
+        postings=postings.astype(np.int32),
+        tfs=tfs.astype(np.int32),
+        doc_len=doc_len,
+        term_max=_term_max(posting_offsets, postings, tfs, doc_len),
+    )
+
+
+def _term_max(posting_offsets, postings, tfs, doc_len) -> np.ndarray:
+    """
+    Borne supérieure de la contribution de chaque mot (toutes les
+    contributions calculées d'un coup, puis maximum par mot).
+    """
+    n_terms = len(posting_offsets) - 1
+    if n_terms == 0:
+        return np.empty(0)
+    avgdl = max(float(doc_len.mean()), 1.0) if len(doc_len) else 1.0
+    df = np.diff(posting_offsets)
+    contrib = _bm25(len(doc_len), np.repeat(df, df), tfs, doc_len[postings], avgdl)
+    return np.maximum.reduceat(contrib, posting_offsets[:-1])
+
+
+def patch_text_index(index: TextIndex, keep: np.ndarray, new_df: pd.DataFrame) -> TextIndex:
+    """
+    Index mis à jour sans tout reconstruire : recettes `keep` gardées (et
+    renumérotées), puis les recettes de `new_df` ajoutées en fin. Seuls les
+    textes ajoutés sont découpés en mots ; les bornes term_max, qui dépendent
+    du nombre de recettes et de la longueur moyenne, sont recalculées.
+    """
+    delta = build_text_index(new_df)
+    n_kept = int(keep.sum())
+    remap = (np.cumsum(keep) - 1).astype(np.int32)
+
+    vocab = np.union1d(index.vocab, delta.vocab)
+    old_map = np.searchsorted(vocab, index.vocab)
+    new_map = np.searchsorted(vocab, delta.vocab)
+
+    # Triplets (mot, recette, fréquence) : gardés puis ajoutés, fusionnés
+    # par un tri stable sur le mot
+    alive = keep[index.postings]
+    terms = np.concatenate([
+        np.repeat(old_map, np.diff(index.posting_offsets))[alive],
+        np.repeat(new_map, np.diff(delta.posting_offsets)),
+    ])
+    postings = np.concatenate([remap[index.postings[alive]], delta.postings + n_kept]).astype(np.int32)
+    tfs = np.concatenate([index.tfs[alive], delta.tfs]).astype(np.int32)
+    order = np.argsort(terms, kind="stable")
+    terms, postings, tfs = terms[order], postings[order], tfs[order]
+
+    # Mots qui ne sont plus dans aucune recette
+    used = np.bincount(terms, minlength=len(vocab)) > 0
+    vocab = vocab[used]
+    terms = (np.cumsum(used) - 1)[terms]
+    posting_offsets = np.searchsorted(terms, np.arange(len(vocab) + 1)).astype(np.int64)
+    doc_len = np.concatenate([index.doc_len[keep], delta.doc_len]).astype(np.int32)
+
+    return TextIndex(
+        vocab=vocab,
+        posting_offsets=posting_offsets,
+        postings=postings,
+        tfs=tfs,
+        doc_len=doc_len,
+        term_max=_term_max(posting_offsets, postings, tfs, doc_len),
+    )
+
+
+def bm25_search(index: TextIndex, query: str, k: int = 20):
+    """
+    Top-k des recettes pour une requête plein texte (score BM25).
+
+    Les mots sont traités du plus discriminant au moins discriminant
+    (borne term_max décroissante). Dès que les mots restants ne peuvent plus,
+    même cumulés, faire entrer une nouvelle recette dans le top-k, ils ne
+    servent plus qu'à mettre à jour le score des candidats déjà trouvés.
+
+    Retour :
+    --------
+    (positions, scores), scores décroissants.
+    """
+    ids = sorted({index.term_id(w) for w in tokenize(query)} - {-1},
+                 key=lambda t: -index.term_max[t])
+    if not ids:
+        return np.empty(0, dtype=np.int32), np.empty(0)
+
+    remaining = np.cumsum([index.term_max[t] for t in ids][::-1])[::-1]
+    cand = np.empty(0, dtype=np.int32)
+    scores = np.empty(0)
+
+    for i, t in enumerate(ids):
+        docs, contrib = index.contributions(t)
+
+        if len(cand) >= k:
+            threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+            if remaining[i] < threshold:
+                # Plus aucune nouvelle recette ne peut entrer dans le top-k
+                pos = np.searchsorted(cand, docs)
+                pos[pos == len(cand)] = 0
+                hit = cand[pos] == docs
+                scores[pos[hit]] += contrib[hit]
+                continue
+
+        all_docs = np.concatenate([cand, docs])
+        all_scores = np.concatenate([scores, contrib])
+        cand, inverse = np.unique(all_docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=all_scores, minlength=len(cand))
+
+    if len(cand) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+        cand, scores = cand[top], scores[top]
+    order = np.lexsort((cand, -scores))
+    return cand[order], scores[order]
@@ -0,0 +1,144 @@
+"""
+Ingestion incrémentale : application de CSV delta sur le jeu de données
+déjà traité (snapshot), sans repasser tout le CSV dans le pipeline.
+
+Un delta a les mêmes colonnes que le CSV source, plus une colonne
+optionnelle 'Deleted' (1 / true / yes) qui marque les tombstones : seule la
+colonne RecipeId compte alors. Pour chaque delta :
+- les tombstones et les anciennes versions des recettes modifiées sont
+  retirées, les recettes nouvelles / modifiées sont ajoutées en fin ;
+- seules les lignes du delta passent par le nettoyage et le parsing ;
+- les index (ingrédients, noms, plein texte) sont mis à jour en place de
+  leur reconstruction. Les tables d'analyse, calculées à partir des colonnes
+  déjà traitées, sont recalculées au chargement.
+
+Les deltas sont rangés dans ~/.recipe_finder/deltas/ et appliqués par ordre
+de nom de fichier au prochain chargement :
+
+    python ingestion_delta.py new_recipes_week42.csv
+"""
+import argparse
+import logging
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from nettoyage import clean_recipe_df, USEFUL_COLS, RAW_DTYPES
+from index_ingredients import IngredientIndex, patch_ingredient_index
+from index_noms import NameIndex, patch_name_index
+from index_texte import TextIndex, patch_text_index
+from telemetrie import IngestionReport, run_stage
+import data_pipeline
+
+logger = logging.getLogger(__name__)
+
+# Colonne des tombstones et valeurs considérées comme vraies
+TOMBSTONE_COL = "Deleted"
+TRUE_VALUES = ("1", "true", "yes", "y")
+
+
+@dataclass
+class DatasetState:
+    """Jeu de données traité et index dérivés (None = pas encore construit)."""
+    df: pd.DataFrame
+    ingredient_index: IngredientIndex
+    name_index: NameIndex | None = None
+    text_index: TextIndex | None = None
+
+
+def list_columns(df: pd.DataFrame) -> list:
+    """Colonnes du jeu traité qui contiennent des listes (vecteurs R parsés)."""
+    cols = []
+    for col in df.columns:
+        non_null = df[col].dropna()
+        if df[col].dtype == object and len(non_null) and isinstance(non_null.iloc[0], list):
+            cols.append(col)
+    return cols
+
+
+def read_delta(path: Path, like: pd.DataFrame, report: IngestionReport | None = None):
+    """
+    Lit un delta et traite ses lignes comme le pipeline complet.
+
+    Retour :
+    --------
+    (recettes ajoutées / modifiées au format de `like`, ids supprimés)
+    """
+    raw = pd.read_csv(
+        path,
+        usecols=lambda c: c in USEFUL_COLS or c == TOMBSTONE_COL,
+        dtype={**RAW_DTYPES, TOMBSTONE_COL: str},
+    )
+    if TOMBSTONE_COL in raw.columns:
+        dead = raw[TOMBSTONE_COL].fillna("").str.strip().str.lower().isin(TRUE_VALUES)
+        raw = raw.drop(columns=TOMBSTONE_COL)
+    else:
+        dead = pd.Series(False, index=raw.index)
+
+    deleted = pd.to_numeric(raw.loc[dead, "RecipeId"], errors="coerce").dropna()
+    deleted = deleted.to_numpy(dtype=np.int64)
+    upserts = raw[~dead]
+    if upserts.empty:
+        return like.iloc[:0].copy(), deleted
+
+    new_rows = run_stage(report, "clean_recipe_df", clean_recipe_df, upserts)
+    new_rows = data_pipeline.process_clean_chunk(new_rows, r_cols=list_columns(like), report=report)
+    return new_rows[like.columns].reset_index(drop=True), deleted
+
+
+def apply_delta(state: DatasetState, path: Path, report: IngestionReport | None = None) -> DatasetState:
+    """Applique un CSV delta à `state` et renvoie le nouvel état."""
+    new_rows, deleted = read_delta(path, state.df, report)
+
+    # Tombstones puis anciennes versions des recettes modifiées
+    ids = state.df["id"].to_numpy()
+    keep = ~np.isin(ids, np.union1d(deleted, new_rows["id"].to_numpy()))
+    n_kept = int(keep.sum())
+
+    ingredient_index = run_stage(report, "patch_ingredient_index", patch_ingredient_index,
+                                 state.ingredient_index, keep, new_rows["ingredients"])
+
+    # Listes d'ingrédients des ajouts internées dans le vocabulaire commun
+    offsets = ingredient_index.offsets[n_kept:]
+    values = ingredient_index.vocab[ingredient_index.ids[offsets[0]:]].tolist()
+    bounds = (offsets - offsets[0]).tolist()
+    new_rows["ingredients"] = [values[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+    name_index = text_index = None
+    if state.name_index is not None:
+        name_index = run_stage(report, "patch_name_index", patch_name_index,
+                               state.name_index, keep, new_rows["name"])
+    if state.text_index is not None:
+        text_index = run_stage(report, "patch_text_index", patch_text_index,
+                               state.text_index, keep, new_rows)
+
+    df = pd.concat([state.df[keep], new_rows], ignore_index=True)
+    logger.info("Applied delta %s: %d removed, %d added or updated, %d recipes",
+                Path(path).name, len(ids) - n_kept, len(new_rows), len(df))
+    return DatasetState(df, ingredient_index, name_index, text_index)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Queue delta CSVs and apply them to the cached dataset.")
+    parser.add_argument("deltas", nargs="+", help="delta CSV files (upserts, 'Deleted' column for tombstones)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    data_pipeline.DELTA_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    for i, path in enumerate(args.deltas):
+        # Préfixe horodaté : les deltas s'appliquent dans l'ordre d'arrivée
+        shutil.copyfile(path, data_pipeline.DELTA_DIR / f"{stamp}-{i:03d}-{Path(path).name}")
+
+    df = data_pipeline.load_recipes()
+    print(f"{len(df)} recipes in {data_pipeline.dataset_snapshot_dir()}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,443 @@
+"""
+Moteur de recherche de recettes indépendant de Streamlit.
+
+Utilisable depuis la page Recipes, un script ou en ligne de commande :
+
+    python moteur_recherche.py queries.jsonl --out results.jsonl
+
+Chaque ligne du fichier est une requête JSON, par exemple :
+    {"ingredients": ["chicken", "garlic", "onion"], "max_time": 45, "limit": 10}
+"""
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass, field, fields
+
+import numpy as np
+import pandas as pd
+
+from index_ingredients import IngredientIndex, MISSING_WEIGHT, pantry_match
+from index_noms import NameIndex, search_names
+from index_texte import TextIndex, bm25_search
+from index_plages import RangeIndex, build_range_index
+from cache_dataset import MappedDataset
+
+# Nombre de candidats gardés pour les recherches par nom / plein texte
+# avant l'application des autres filtres
+TEXT_CANDIDATES = 1000
+
+# Table directe id -> position tant que max(id) reste sous ce multiple du
+# nombre de recettes (ou sous ID_TABLE_MIN entrées) ; au-delà, recherche
+# dichotomique sur les ids triés
+ID_TABLE_SPREAD = 8
+ID_TABLE_MIN = 1 << 20
+
+# Champs de RecipeQuery filtrés par plage : colonne et sens de la borne
+# (0 = pas de limite)
+RANGE_FILTERS = {
+    "max_time": ("total_time_min", "max"),
+    "max_calories": ("calories", "max"),
+    "max_fat": ("fat", "max"),
+    "max_sugar": ("sugar", "max"),
+    "min_protein": ("protein", "min"),
+}
+
+SORTS = ("relevance", "rating", "time", "calories")
+MATCH_MODES = ("all", "pantry")
+
+
+def _is_int(value) -> bool:
+    """Entier Python (bool exclu)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def build_id_table(ids: np.ndarray) -> np.ndarray | None:
+    """
+    Table table[id] = position (-1 si aucune recette), ou None si les ids
+    sont négatifs ou trop dispersés pour une table directe.
+    """
+    if len(ids) == 0 or ids.min() < 0:
+        return None
+    size = int(ids.max()) + 1
+    if size > max(ID_TABLE_SPREAD * len(ids), ID_TABLE_MIN):
+        return None
+    table = np.full(size, -1, dtype=np.int32 if len(ids) < 2**31 else np.int64)
+    table[ids] = np.arange(len(ids))
+    return table
+
+
+@dataclass
+class RecipeQuery:
+    """
+    Requête structurée. Les critères vides ne filtrent rien.
+
+    - ingredients : ingrédients choisis
+    - match : "all" (tous les ingrédients) ou "pantry" (classement garde-manger)
+    - max_missing : mode pantry, nombre max d'ingrédients manquants
+    - max_time / max_calories / max_fat / max_sugar : plafonds (0 = pas de limite)
+    - min_protein : plancher (0 = pas de limite)
+    - name : recherche par nom (trigrammes)
+    - text : recherche plein texte (BM25)
+    - limit : nombre de résultats (None = tous)
+    - sort : "relevance", "rating", "time" ou "calories"
+    """
+    ingredients: list = field(default_factory=list)
+    match: str = "all"
+    max_missing: int | None = None
+    max_time: int = 0
+    max_calories: float = 0
+    max_fat: float = 0
+    max_sugar: float = 0
+    min_protein: float = 0
+    name: str = ""
+    text: str = ""
+    limit: int | None = 10
+    sort: str = "relevance"
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RecipeQuery":
+        if not isinstance(data, dict):
+            raise ValueError("a query must be a JSON object")
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown query fields: {sorted(unknown)}")
+        query = cls(**data)
+        if query.sort not in SORTS:
+            raise ValueError(f"sort must be one of {SORTS}")
+        if query.match not in MATCH_MODES:
+            raise ValueError(f"match must be one of {MATCH_MODES}")
+
+        # Types vérifiés ici plutôt qu'au fond du moteur ("a" n'est pas ["a"])
+        if not isinstance(query.ingredients, list) or not all(isinstance(i, str) for i in query.ingredients):
+            raise ValueError("ingredients must be a list of strings")
+        for attr in ("name", "text"):
+            if not isinstance(getattr(query, attr), str):
+                raise ValueError(f"{attr} must be a string")
+        if query.limit is not None and (not _is_int(query.limit) or query.limit < 1):
+            raise ValueError("limit must be null or an integer >= 1")
+        if query.max_missing is not None and (not _is_int(query.max_missing) or query.max_missing < 0):
+            raise ValueError("max_missing must be null or an integer >= 0")
+        for attr in RANGE_FILTERS:
+            value = getattr(query, attr)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"{attr} must be a number")
+        return query
+
+
+@dataclass
+class QueryResult:
+    """Résultat : positions dans le DataFrame, identifiants et scores."""
+    positions: np.ndarray
+    ids: np.ndarray
+    scores: np.ndarray
+
+
+class RecipeQueryEngine:
+    """
+    Filtres et classements de la page Recipes, sans aucune dépendance à
+    Streamlit. Construit sur le jeu de données (DataFrame de load_recipes()
+    ou MappedDataset de load_dataset()) et ses index.
+    """
+
+    def __init__(self, df: "pd.DataFrame | MappedDataset", ingredient_index: IngredientIndex,
+                 name_index: NameIndex, text_index: TextIndex, range_index: RangeIndex | None = None,
+                 version: str = ""):
+        self.df = df
+        # Version du jeu de données (clé du snapshot), pour les caches de résultats
+        self.version = version
+        self.ingredient_index = ingredient_index
+        self.name_index = name_index
+        self.text_index = text_index
+        self.range_index = range_index if range_index is not None else build_range_index(df)
+
+        # Colonnes des filtres par plage, pour vérifier quelques recettes à la fois
+        self.range_values = {col: df[col].to_numpy() for col in self.range_index.columns.tolist()}
+
+        self.ids = df["id"].to_numpy()
+        self.total_time = df["total_time_min"].to_numpy()
+        self.calories = df["calories"].to_numpy()
+        self.rating = df["rating"].to_numpy()
+
+        # Identifiant -> position : table directe, sinon ids triés
+        self._id_table = build_id_table(self.ids)
+        self._id_order = np.argsort(self.ids, kind="stable") if self._id_table is None else None
+
+    @classmethod
+    def from_pipeline(cls) -> "RecipeQueryEngine":
+        """Charge le jeu de données et les index via data_pipeline."""
+        from data_pipeline import (
+            load_dataset, load_ingredient_index, load_name_index, load_text_index, load_range_index,
+            dataset_snapshot_dir,
+        )
+        return cls(load_dataset(), load_ingredient_index(), load_name_index(), load_text_index(),
+                   load_range_index(), version=dataset_snapshot_dir().name)
+
+    def positions_of(self, recipe_ids) -> np.ndarray:
+        """Positions des recettes d'identifiants `recipe_ids` (-1 si absentes)."""
+        recipe_ids = np.asarray(recipe_ids, dtype=np.int64).ravel()
+        out = np.full(len(recipe_ids), -1, dtype=np.int64)
+        if self._id_table is not None:
+            inside = (recipe_ids >= 0) & (recipe_ids < len(self._id_table))
+            out[inside] = self._id_table[recipe_ids[inside]]
+        elif len(self.ids):
+            i = np.searchsorted(self.ids, recipe_ids, sorter=self._id_order)
+            pos = self._id_order[np.minimum(i, len(self.ids) - 1)]
+            found = self.ids[pos] == recipe_ids
+            out[found] = pos[found]
+        return out
+
+    def range_predicates(self, query: RecipeQuery) -> list:
+        """Filtres par plage de la requête : (colonne, lo, hi), bornes incluses."""
+        predicates = []
+        for attr, (col, side) in RANGE_FILTERS.items():
+            limit = getattr(query, attr)
+            if limit > 0:
+                predicates.append((col, -np.inf, limit) if side == "max" else (col, limit, np.inf))
+        return predicates
+
+    def plan(self, query: RecipeQuery) -> list:
+        """
+        Prédicats de filtrage de la requête, du plus sélectif au moins
+        sélectif : [(nombre de recettes, "ingredient" | "range", paramètre)].
+
+        Les nombres sont exacts et ne coûtent rien : longueur de la liste de
+        l'index inversé pour un ingrédient (mode "all"), recherche
+        dichotomique dans l'index de plages pour un plafond. Un ingrédient
+        inconnu donne (0, "ingredient", -1).
+        """
+        plan = []
+        if query.ingredients and query.match == "all":
+            offsets = self.ingredient_index.posting_offsets
+            for ing in set(query.ingredients):
+                i = self.ingredient_index.ingredient_id(ing)
+                count = int(offsets[i + 1] - offsets[i]) if i >= 0 else 0
+                plan.append((count, "ingredient", i))
+        for col, lo, hi in self.range_predicates(query):
+            plan.append((self.range_index.count(col, lo, hi), "range", (col, lo, hi)))
+        plan.sort(key=lambda p: p[0])
+        return plan
+
+    def satisfies(self, positions: np.ndarray, plan: list) -> np.ndarray:
+        """
+        Masque des `positions` qui vérifient tous les prédicats de `plan`,
+        recette par recette : recherche dans la liste de l'ingrédient,
+        lecture de la valeur pour une plage. Coût proportionnel au nombre
+        de positions, jamais au nombre total de recettes.
+        """
+        keep = np.ones(len(positions), dtype=bool)
+        for _, kind, arg in plan:
+            pos = positions[keep]
+            if len(pos) == 0:
+                break
+            if kind == "ingredient":
+                if arg < 0:
+                    ok = np.zeros(len(pos), dtype=bool)
+                else:
+                    postings = self.ingredient_index.recipes_with(arg)
+                    i = np.searchsorted(postings, pos)
+                    ok = i < len(postings)
+                    ok[ok] = postings[i[ok]] == pos[ok]
+            else:
+                col, lo, hi = arg
+                v = self.range_values[col][pos]
+                ok = (v >= lo) & (v <= hi)
+            keep[keep] = ok
+        return keep
+
+    def candidates(self, plan: list) -> np.ndarray:
+        """
+        Positions triées qui vérifient tout le plan : seul le prédicat le plus
+        sélectif est matérialisé, les autres sont vérifiés sur ses positions.
+        """
+        _, kind, arg = plan[0]
+        if kind == "ingredient":
+            first = self.ingredient_index.recipes_with(arg) if arg >= 0 else np.empty(0, dtype=np.int32)
+        else:
+            first = self.range_index.positions(*arg)
+        return first[self.satisfies(first, plan[1:])]
+
+    def search(self, query: RecipeQuery) -> QueryResult:
+        # Candidats (positions triées) et scores de pertinence
+        positions = None
+        scores = None
+
+        def restrict(new_pos, new_scores):
+            nonlocal positions, scores
+            if positions is None:
+                positions, scores = new_pos, new_scores
+                return
+            common, i, j = np.intersect1d(positions, new_pos, assume_unique=True, return_indices=True)
+            positions, scores = common, scores[i] + new_scores[j]
+
+        # Ingrédients (mode "all") et plages, du plus sélectif au moins sélectif
+        plan = self.plan(query)
+        ranges = [p for p in plan if p[1] == "range"]
+
+        if query.ingredients and query.match == "all":
+            pos = self.candidates(plan)
+            restrict(pos, np.zeros(len(pos)))
+            ranges = []
+
+        elif query.ingredients:
+            # Classement par pertinence seul : le top-k du garde-manger suffit.
+            # Les plages sont vérifiées avant la sélection du top-k.
+            ranked_alone = (query.sort == "relevance" and query.limit is not None and query.limit > 0
+                            and not query.name.strip() and not query.text.strip())
+            pos, used, missing = pantry_match(
+                self.ingredient_index, query.ingredients,
+                k=query.limit if ranked_alone else self.ingredient_index.n_recipes,
+                max_missing=query.max_missing,
+                allowed=(lambda rows: self.satisfies(rows, ranges)) if ranges else None,
+            )
+            order = np.argsort(pos)
+            restrict(pos[order], (used - MISSING_WEIGHT * missing)[order].astype(float))
+            ranges = []
+
+        if query.name.strip():
+            pos = search_names(self.name_index, query.name, k=TEXT_CANDIDATES)
+            # Score décroissant avec le rang
+            rank_scores = 1.0 / (1 + np.arange(len(pos)))
+            order = np.argsort(pos)
+            restrict(pos[order], rank_scores[order])
+
+        if query.text.strip():
+            pos, bm25 = bm25_search(self.text_index, query.text, k=TEXT_CANDIDATES)
+            order = np.argsort(pos)
+            restrict(pos[order], bm25[order])
+
+        if positions is None:
+            # Plages seules : la plus sélective est matérialisée
+            if ranges:
+                positions = self.candidates(ranges)
+                ranges = []
+            else:
+                positions = np.arange(len(self.df), dtype=np.int32)
+            scores = np.zeros(len(positions))
+
+        if ranges:
+            keep = self.satisfies(positions, ranges)
+            positions, scores = positions[keep], scores[keep]
+
+        positions, scores = self._sort(positions, scores, query)
+        return QueryResult(positions=positions, ids=self.ids[positions], scores=scores)
+
+    def sample(self, positions: np.ndarray, k: int, seed: int) -> np.ndarray:
+        """
+        k positions tirées au hasard parmi `positions`, sans remise. Le tirage
+        ne dépend que de `seed` et de `positions` : même graine, même page.
+        """
+        rng = np.random.default_rng(seed)
+        return positions[rng.choice(len(positions), size=min(k, len(positions)), replace=False)]
+
+    def page(self, positions: np.ndarray, sort: str, page: int, page_size: int) -> np.ndarray:
+        """
+        Page `page` (0 = première) de `positions` triées selon `sort`. Seules
+        les (page + 1) * page_size premières sont sélectionnées puis triées ;
+        les égalités sont départagées par position, l'ordre est donc stable
+        d'une page à l'autre.
+        """
+        end = min((page + 1) * page_size, len(positions))
+        if page < 0 or page_size <= 0 or end <= page * page_size:
+            return positions[:0]
+        top, _ = self._sort(positions, np.zeros(len(positions)), RecipeQuery(sort=sort, limit=end))
+        return top[page * page_size:end]
+
+    def _sort(self, positions, scores, query: RecipeQuery):
+        """
+        Tri demandé + sélection partielle des `limit` premiers. Les égalités
+        sont départagées par position, y compris à la limite : le résultat
+        ne dépend pas de `limit` (pages stables).
+        """
+        if query.sort == "rating":
+            key = -self.rating[positions]
+        elif query.sort == "time":
+            # Temps inconnu (0 minute) en dernier
+            time = self.total_time[positions].astype(float)
+            key = np.where(time > 0, time, np.inf)
+        elif query.sort == "calories":
+            key = self.calories[positions]
+        else:
+            key = -scores
+
+        limit = query.limit
+        if limit is not None and limit <= 0:
+            return positions[:0], scores[:0]
+        if limit is not None and len(positions) > limit:
+            kth = np.partition(key, limit - 1)[limit - 1]
+            if np.isnan(kth):
+                above, ties = np.flatnonzero(~np.isnan(key)), np.flatnonzero(np.isnan(key))
+            else:
+                above, ties = np.flatnonzero(key < kth), np.flatnonzero(key == kth)
+            ties = ties[np.argsort(positions[ties], kind="stable")][: limit - len(above)]
+            top = np.concatenate([above, ties])
+            positions, scores, key = positions[top], scores[top], key[top]
+
+        order = np.lexsort((positions, key))
+        return positions[order], scores[order]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run a JSONL file of recipe queries.")
+    parser.add_argument("queries", help="JSONL file, one RecipeQuery per line")
+    parser.add_argument("--out", help="write one JSON result per line to this file")
+    parser.add_argument("--repeat", type=int, default=1, help="run the whole file N times")
+    args = parser.parse_args(argv)
+
+    # Toutes les lignes invalides sont signalées (fichier:ligne) avant de
+    # charger le jeu de données
+    queries = []
+    errors = 0
+    with open(args.queries, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                queries.append(RecipeQuery.from_dict(json.loads(line)))
+            except (ValueError, TypeError) as e:
+                print(f"{args.queries}:{lineno}: {e}", file=sys.stderr)
+                errors += 1
+    if errors:
+        print(f"{errors} invalid queries, nothing run", file=sys.stderr)
+        return 1
+
+    t0 = time.perf_counter()
+    engine = RecipeQueryEngine.from_pipeline()
+    load_s = time.perf_counter() - t0
+
+    latencies = []
+    results = []
+    for _ in range(args.repeat):
+        results = []
+        for q in queries:
+            t = time.perf_counter()
+            results.append(engine.search(q))
+            latencies.append(time.perf_counter() - t)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for i, r in enumerate(results):
+                f.write(json.dumps({
+                    "query": i,
+                    "ids": r.ids.tolist(),
+                    "scores": [round(float(s), 6) for s in r.scores],
+                }) + "\n")
+
+    lat = np.array(latencies) * 1000
+    total = lat.sum() / 1000
+    report = {
+        "queries": len(latencies),
+        "load_s": round(load_s, 3),
+        "total_s": round(total, 3),
+        "qps": round(len(latencies) / total, 1) if total > 0 else None,
+        "mean_ms": round(float(lat.mean()), 3) if len(lat) else None,
+        "p50_ms": round(float(np.percentile(lat, 50)), 3) if len(lat) else None,
+        "p95_ms": round(float(np.percentile(lat, 95)), 3) if len(lat) else None,
+    }
+    print(json.dumps(report), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,44 @@
 import pandas as pd
 
+# Colonnes utiles du CSV brut (les autres sont ignorées dès la lecture)
+USEFUL_COLS = [
+    "RecipeId", "Name", "RecipeCategory",
+    "Description", "Images",
+    "RecipeIngredientParts", "RecipeIngredientQuantities","RecipeInstructions",
+    "AggregatedRating", "ReviewCount",
+    "CookTime", "PrepTime", "TotalTime","Calories", "FatContent", "SugarContent", "ProteinContent",
+]
+
+# Colonnes numériques du CSV brut : lues comme du texte puis converties par
+# clean_recipe_df (une cellule vide ou non numérique devient NaN au lieu de
+# faire échouer la lecture d'un bloc)
+NUMERIC_COLS = [
+    "AggregatedRating", "ReviewCount",
+    "Calories", "FatContent", "SugarContent", "ProteinContent",
+]
+
+# Types explicites pour la lecture du CSV (évite l'inférence de type
+# colonne par colonne et les types différents d'un bloc à l'autre)
+RAW_DTYPES = {
+    "RecipeId": str,
+    "Name": str,
+    "RecipeCategory": str,
+    "Description": str,
+    "Images": str,
+    "RecipeIngredientParts": str,
+    "RecipeIngredientQuantities": str,
+    "RecipeInstructions": str,
+    "AggregatedRating": str,
+    "ReviewCount": str,
+    "CookTime": str,
+    "PrepTime": str,
+    "TotalTime": str,
+    "Calories": str,
+    "FatContent": str,
+    "SugarContent": str,
+    "ProteinContent": str,
+}
+
 def clean_recipe_df(df: pd.DataFrame) -> pd.DataFrame:
     """
     Nettoie le DataFrame des recettes :
@@ -9,23 +48,24 @@ def clean_recipe_df(df: pd.DataFrame) -> pd.DataFrame:
     - renvoie un DataFrame prêt pour parsing + graphes
     """
 
-    # 1) Colonnes utiles
-    useful_cols = [
-        "RecipeId", "Name", "RecipeCategory",
-        "Description", "Images",
-        "RecipeIngredientParts", "RecipeIngredientQuantities","RecipeInstructions",
-        "AggregatedRating", "ReviewCount",
-        "CookTime", "PrepTime", "TotalTime","Calories", "FatContent", "SugarContent", "ProteinContent",
-    ]
+    # 1) Colonnes utiles (USEFUL_COLS)
 
     # 2) Intersect avec celles réellement présentes
-    cols_to_keep = [c for c in useful_cols if c in df.columns]
+    cols_to_keep = [c for c in USEFUL_COLS if c in df.columns]
 
     df = df[cols_to_keep].copy()
 
-    # 3) Convertir les ratings en numéros si besoin
-    if df["AggregatedRating"].dtype == "object":
-        df["AggregatedRating"] = pd.to_numeric(df["AggregatedRating"], errors="coerce")
+    # 3) Convertir les colonnes numériques (texte invalide -> NaN)
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    # Identifiant manquant ou non entier -> recette supprimée
+    if "RecipeId" in df.columns:
+        ids = pd.to_numeric(df["RecipeId"], errors="coerce")
+        keep = ids.notna() & (ids == ids.round())
+        df = df[keep].copy()
+        df["RecipeId"] = ids[keep].astype("int64")
 
     # 4) Convertir ReviewCount en entier
     if "ReviewCount" in df.columns:
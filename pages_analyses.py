@@ -1,24 +1,13 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-import numpy as np
+from agregats_analyses import AnalysisStore
 
 
-def render_global_analysis_page(df):
+def render_global_analysis_page(store: AnalysisStore):
 
-
-    data = df.copy()
-
-    # On prépare une colonne "n_ingredients" pour les graphes
-    def count_ingredients(val):
-        if isinstance(val, list):
-            return len(val)
-        elif isinstance(val, str):
-            return len([x for x in val.split(",") if x.strip()])
-        else:
-            return np.nan
-
-    data["n_ingredients"] = data["ingredients"].apply(count_ingredients)
+    # Toutes les tables sont pré-calculées au chargement (agregats_analyses) :
+    # les sliders ne font que filtrer / couper ces tables
 
 
     st.header("\U0001F4CA Overall analysis of recipes")
@@ -49,14 +38,9 @@ def render_global_analysis_page(df):
             step=5,)
 
     with col2:
-        pop = data[data[["rating", "reviews"]].notna().all(axis=1)].copy()
-        pop = pop[pop["reviews"] >= min_reviews]
-
-
-        pop["pop_score"] = pop["rating"] * np.log1p(pop["reviews"])
-
+        pop = store.popular
         top_pop = (
-            pop.sort_values("pop_score", ascending=False)
+            pop[pop["reviews"] >= min_reviews]
             .head(top_n)
             .sort_values("pop_score")
         )
@@ -121,33 +105,10 @@ def render_global_analysis_page(df):
 
     with col_chart:
 
-        #Ici on supprime les catégories qui représente un durée de préparation
-        data_clean = data[~data["category"].str.contains("<", na=False)].copy()
-
-        counts = data_clean["category"].value_counts()
-
         # on garde les catégories avec assez de recettes
-        valid_cats = counts[counts >= min_recipes].index
-
-
-        mean_time = (
-            data_clean[data_clean["category"].isin(valid_cats)]
-            .groupby("category")["total_time_min"]
-            .mean()
-            .reset_index()
-        )
-
-        
-        mean_time = (
-            mean_time.sort_values("total_time_min")
-            .head(n_cats)
-            .sort_values("total_time_min")
-        )
-
-        
-        mean_time["category_short"] = mean_time["category"].apply(
-            lambda x: x if len(x) <= 30 else x[:27] + "..."
-        )
+        # (catégories de durée déjà exclues, triées par temps moyen)
+        cat_time = store.category_time
+        mean_time = cat_time[cat_time["n_recipes"] >= min_recipes].head(n_cats)
 
         if mean_time.empty:
             st.info("No categories match the filters.")
@@ -217,14 +178,10 @@ def render_global_analysis_page(df):
         )
 
     with col_chart:
-        bubble = data[
-            data[["rating", "reviews", "calories", "total_time_min"]].notna().all(axis=1)].copy()
-
+        bubble = store.bubble
         bubble = bubble[
             (bubble["reviews"] >= min_reviews_pop)
             & (bubble["calories"] <= max_cal_pop)
-            & (bubble["calories"] > 0)
-            & (bubble["total_time_min"] > 0)
         ]
 
         
@@ -256,7 +213,7 @@ def render_global_analysis_page(df):
                 coloraxis_colorbar_title="Total time (min)",
             )
             fig.update_yaxes(constrain='domain',
-                            range=[data["rating"].min() - 0.4,data["rating"].max() + 0.4])
+                            range=[store.rating_range[0] - 0.4, store.rating_range[1] + 0.4])
 
 
             st.plotly_chart(fig, width='stretch')
@@ -275,11 +232,7 @@ def render_global_analysis_page(df):
     nutri_cols = ["fat", "sugar", "protein"]
 
     
-    nutri_mean = (
-        data.groupby("category")[nutri_cols]
-        .mean(numeric_only=True)
-        .dropna()
-    )
+    nutri_mean = store.nutrition
     if nutri_mean.empty:
         st.warning("No nutritional data available to build this chart.")
     else:
@@ -358,49 +311,13 @@ def render_global_analysis_page(df):
 
     with col_chart:
        
-        score_df = data[
-            data[["rating", "total_time_min", "calories"]].notna().all(axis=1)
-        ].copy()
-        score_df = score_df[
-            (score_df["total_time_min"] > 0)
-            & (score_df["calories"] > 0)
-    ]
+        score_df = store.optimised
 
         if score_df.empty:
             st.info("No recipes comply with the current filters.")
         else:
-            
-            def norm_col(s):
-                s = s.astype(float)
-                denom = s.max() - s.min()
-                if denom == 0:
-                    return s * 0 + 0.5
-                return (s - s.min()) / denom
-
-            score_df["rating_norm"] = norm_col(score_df["rating"]) 
-            score_df["time_norm"] = 1 / score_df["total_time_min"]
-            score_df["time_norm"] = norm_col(score_df["time_norm"])
-            score_df["cal_norm"] = 1 / score_df["calories"]
-            score_df["cal_norm"] = norm_col(score_df["cal_norm"])
-
-           
-            score_df["score"] = (
-                0.4 * score_df["rating_norm"]
-                + 0.3 * score_df["time_norm"]
-                + 0.3 * score_df["cal_norm"]
-        )
+            top = score_df.head(top_n).sort_values("score")
 
-            top = (
-                score_df.sort_values("score", ascending=False)
-                .head(top_n)
-                .sort_values("score")
-        )
-
-            
-            top["name_short"] = top["name"].apply(
-                lambda x: x if len(x) <= 40 else x[:37] + "..."
-        )
-            
             fig = px.bar(
                 top,
                 x="score",
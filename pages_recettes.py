@@ -1,143 +1,151 @@
+import numpy as np
 import streamlit as st
 import pandas as pd
+from moteur_recherche import RecipeQuery, RecipeQueryEngine
+from fiches_recettes import DetailCache, RecipeDetail
+from cache_requetes import QueryCache
+from index_ingredients import suggest_ingredients
 
-def render_recipes_page(df: pd.DataFrame):
-    st.header("\U0001F372 Recipes")
+# Nombre de recettes proposées pour une recherche par nom / plein texte
+NAME_RESULTS = 20
 
-    
-    # Filtres
-    
-    st.sidebar.subheader("\U0001F50D Filters")
+# Nombre de recettes tirées au hasard / affichées par page
+SAMPLE_SIZE = 10
+PAGE_SIZE = 10
 
-    # Choix du mode de recherche 
-    search_mode = st.sidebar.radio(
-        "Search mode",
-        ("By ingredients", "By recipe name")
-    )
+# Tris proposés pour parcourir toutes les recettes retenues
+BROWSE_SORTS = {"Best rated": "rating", "Quickest": "time", "Fewest calories": "calories"}
 
-    # Liste d'ingrédients disponibles
-    all_ingredients = sorted(
-        {
-            ing
-            for lst in df["ingredients"]
-            if isinstance(lst, list)
-            for ing in lst
-        }
-    )
+# Nombre d'ingrédients proposés par l'autocomplétion
+INGREDIENT_SUGGESTIONS = 50
 
-    # Liste des noms de recettes
-    all_names = sorted(df["name"].dropna().unique().tolist())
+# Couleurs des cartes nutritionnelles, dans l'ordre de fiches_recettes.NUTRIENTS
+NUTRITION_COLORS = ("#95d5b2", "#74c69d", "#52b788", "#4aa87f")
 
-    # MODE 1 : PAR NOM DE RECETTE
 
-    if search_mode == "By recipe name":
+def new_seed() -> int:
+    """Graine d'un nouveau tirage aléatoire."""
+    return int(np.random.default_rng().integers(2**31))
 
-        name_query = st.sidebar.text_input(
-            "Recipe name :",
-            "",
-            help="Type the exact recipe name (or at least enough to find it)"
-        )
 
-       
-        if not name_query.strip():
-            st.info("\U0001F448 Type a recipe name in the sidebar to display it.")
-            st.stop()
+def render_recipe_detail(detail: RecipeDetail):
+    """Fiche détaillée d'une recette (mêmes blocs pour tous les modes de recherche)."""
+    st.subheader(detail.name)
+    st.caption(detail.times)
 
-        # On cherche les recettes qui contiennent exactement ce texte
-        filtered = df[df["name"].str.contains(name_query.strip(), case=False, na=False)]
+    # Description
+    st.markdown("### \U0001F4DD Description")
+    st.write(detail.description)
 
-        if filtered.empty:
-            st.error("❌ No recipe found with this name.")
-            st.stop()
+    # Ingrédients
+    st.markdown("### \U0001F9C2 Ingredients")
+    if detail.ingredients is not None:
+        for ing in detail.ingredients:
+            st.write(f"- {ing}")
+    else:
+        st.write("Ingredients unavailable for this recipe.")
 
-        # On prend la première occurrence si plusieurs recettes ont le même nom
-        recette = filtered.iloc[0]
+    # Quantités
+    st.markdown("### ⚖️ Quantities")
+    if detail.quantities is not None:
+        for i, q in detail.quantities:
+            st.write(f"- **{i}** : {q}")
+    else:
+        st.warning("Quantities unavailable for this recipe.")
 
-        st.markdown("### \U0001F3AF Selected recipe")
-        st.subheader(recette["name"])
+    # Instructions
+    st.markdown("### 👩‍🍳 Steps")
+    if detail.steps:
+        for step in detail.steps:
+            st.write(f"- {step}")
+    else:
+        st.write("Steps unavailable for this recipe.")
 
+    # Nutrition
+    st.markdown("### \U0001F955 Nutritional information : ")
 
-        # Fiche détaillée directe
+    for col, color, (label, value) in zip(st.columns(4), NUTRITION_COLORS, detail.nutrition):
+        with col:
+            st.markdown(f"""
+            <div style='padding:15px; background-color:{color}; border-radius:10px; text-align:center;'>
+                <h4 style='margin-bottom:5px;'>{label}</h4>
+                <p style='font-size:20px; font-weight:600; margin:0;'>{value}</p>
+            </div>
+            """, unsafe_allow_html=True)
 
 
-        # Description
-        st.markdown("### \U0001F4DD Description")
-        st.write(recette["description"])
+def render_recipes_page(df: pd.DataFrame, engine: RecipeQueryEngine, details: DetailCache,
+                        queries: QueryCache):
+    """
+    Page Recipes. `df` est le jeu de données partagé par toutes les sessions
+    (MappedDataset de load_dataset() ou DataFrame) : il n'est jamais modifié
+    ni copié en entier, seules les lignes affichées sont extraites (df.iloc
+    sur des positions). Les fiches détaillées viennent de `details` et les
+    résultats de recherche de `queries`, caches partagés eux aussi.
+    """
+    st.header("\U0001F372 Recipes")
 
-        # Ingrédients
-        st.markdown("### \U0001F9C2 Ingredients")
-        if isinstance(recette["ingredients"], list):
-            for ing in recette["ingredients"]:
-                st.write(f"- {ing}")
-        else:
-            st.write("Ingredients unavailable for this recipe.")
-
-        # Quantités
-        st.markdown("### ⚖️ Quantities")
-        if isinstance(recette["quantities"], list) and isinstance(recette["ingredients"], list) \
-        and len(recette["quantities"]) == len(recette["ingredients"]):
-            for q, i in zip(recette["quantities"], recette["ingredients"]):
-                st.write(f"- **{i}** : {q}")
-        else:
-            st.warning("Quantities unavailable for this recipe.")
+    
+    # Filtres
+    
+    st.sidebar.subheader("\U0001F50D Filters")
 
-        # Instructions
-        st.markdown("### 👩‍🍳 Steps")
-        if isinstance(recette["instructions"], list):
-            for step in recette["instructions"]:
-                st.write(f"- {step}")
-        else:
-            st.write(recette["instructions"])
+    # Choix du mode de recherche 
+    search_mode = st.sidebar.radio(
+        "Search mode",
+        ("By ingredients", "By recipe name", "Full text")
+    )
 
-        # Nutrition 
-        st.markdown("### \U0001F955 Nutritional information : ")
+    # MODE 1 : PAR NOM DE RECETTE / PLEIN TEXTE
 
-        cal = recette.get("calories", None)
-        fat = recette.get("fat", None)
-        sugar = recette.get("sugar", None)
-        protein = recette.get("protein", None)
+    if search_mode in ("By recipe name", "Full text"):
 
-        def fmt(value, suffix=""):
-            if value is None or (isinstance(value, (int, float)) and pd.isna(value)):
-                return "N/A"
-            v = round(float(value), 1)
-            if v.is_integer():
-                v = int(v)
-            return f"{v}{suffix}"
+        if search_mode == "By recipe name":
+            name_query = st.sidebar.text_input(
+                "Recipe name :",
+                "",
+                help="Type part of the recipe name (small typos are tolerated)"
+            )
 
-        col1, col2, col3, col4 = st.columns(4)
+            if not name_query.strip():
+                st.info("\U0001F448 Type a recipe name in the sidebar to display it.")
+                st.stop()
 
-        with col1:
-            st.markdown(f"""
-            <div style='padding:15px; background-color:#95d5b2; border-radius:10px; text-align:center;'>
-                <h4 style='margin-bottom:5px;'>\U0001F525 Calories</h4>
-                <p style='font-size:20px; font-weight:600; margin:0;'>{fmt(cal, " kcal")}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            # Index de trigrammes : noms qui contiennent le texte d'abord,
+            # puis noms approchants (fautes de frappe)
+            positions = queries.search(engine, RecipeQuery(name=name_query, limit=NAME_RESULTS)).positions
 
-        with col2:
-            st.markdown(f"""
-            <div style='padding:15px; background-color:#74c69d; border-radius:10px; text-align:center;'>
-                <h4 style='margin-bottom:5px;'>\U0001F951 Fat</h4>
-                <p style='font-size:20px; font-weight:600; margin:0;'>{fmt(fat, " g")}</p>
-            </div>
-            """, unsafe_allow_html=True)
+        else:
+            text_query = st.sidebar.text_input(
+                "Search in names, descriptions and steps :",
+                "",
+                help='For example "one pot spicy" or "no oven"'
+            )
 
-        with col3:
-            st.markdown(f"""
-            <div style='padding:15px; background-color:#52b788; border-radius:10px; text-align:center;'>
-                <h4 style='margin-bottom:5px;'>\U0001F9C1 Sugar</h4>
-                <p style='font-size:20px; font-weight:600; margin:0;'>{fmt(sugar, " g")}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            if not text_query.strip():
+                st.info("\U0001F448 Type a few words in the sidebar to search all recipes.")
+                st.stop()
 
-        with col4:
-            st.markdown(f"""
-            <div style='padding:15px; background-color:#4aa87f; border-radius:10px; text-align:center;'>
-                <h4 style='margin-bottom:5px;'>\U0001F357 Protein</h4>
-                <p style='font-size:20px; font-weight:600; margin:0;'>{fmt(protein, " g")}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            # Index BM25 : recettes classées par pertinence
+            positions = queries.search(engine, RecipeQuery(text=text_query, limit=NAME_RESULTS)).positions
+
+        if len(positions) == 0:
+            st.error("❌ No recipe found with this name." if search_mode == "By recipe name"
+                     else "❌ No recipe matches these words.")
+            st.stop()
+
+        candidates = df.iloc[positions]
+
+        # L'utilisateur choisit parmi les meilleurs candidats
+        choice = st.sidebar.selectbox(
+            f"Matching recipes ({len(candidates)}) :",
+            options=range(len(candidates)),
+            format_func=lambda i: candidates["name"].iloc[i],
+        )
+        detail = details.get(engine.ids[positions[choice]])
+
+        st.markdown("### \U0001F3AF Selected recipe")
+        render_recipe_detail(detail)
 
         return
 
@@ -145,10 +153,22 @@ def render_recipes_page(df: pd.DataFrame):
     # MODE 2 : PAR INGRÉDIENTS
 
 
+    # Autocomplétion côté serveur : le multiselect ne reçoit que les
+    # ingrédients déjà choisis + les plus fréquents qui commencent par le
+    # texte tapé, jamais tout le vocabulaire
+    prefix = st.sidebar.text_input(
+        "\U0001F50E Find an ingredient :",
+        "",
+        help="Type the beginning of an ingredient name; the most common matches are listed below."
+    )
+    selected = st.session_state.get("ingredient_filter", [])
+    suggestions = suggest_ingredients(engine.ingredient_index, prefix, k=INGREDIENT_SUGGESTIONS)
+
     # Multiselect ingrédients
     ingredient_filter = st.sidebar.multiselect(
         "Select at least 3 ingredients :",
-        options=all_ingredients,
+        options=list(dict.fromkeys(selected + suggestions)),
+        key="ingredient_filter",
         help="Select at least 3 ingredients to see recipes."
     )
 
@@ -156,6 +176,24 @@ def render_recipes_page(df: pd.DataFrame):
         st.warning("\U0001F449 Select at least **3 ingredients** to begin with.")
         st.stop()
 
+    # Correspondance stricte (tous les ingrédients) ou classée
+    match_mode = st.sidebar.radio(
+        "Matching",
+        ("All ingredients", "Best pantry match"),
+        help="Best pantry match ranks recipes by how many of your ingredients "
+             "they use and how few other ingredients they need."
+    )
+    ranked = match_mode == "Best pantry match"
+
+    if ranked:
+        max_missing = st.sidebar.number_input(
+            "\U0001F9FA Maximum missing ingredients :",
+            min_value=0,
+            max_value=50,
+            value=3,
+            help="Ingredients of the recipe that are not in your selection"
+        )
+
     # Temps max 
     temps_max = st.sidebar.number_input(
         "⌛ Maximum time (minutes) :",
@@ -174,46 +212,84 @@ def render_recipes_page(df: pd.DataFrame):
         help="0 =  no limit"
     )
 
+    # Autres limites nutritionnelles (index de plages du moteur)
+    with st.sidebar.expander("\U0001F957 More nutrition limits"):
+        fat_max = st.number_input("Maximum fat (g) :", min_value=0, value=0, help="0 = no limit")
+        sugar_max = st.number_input("Maximum sugar (g) :", min_value=0, value=0, help="0 = no limit")
+        protein_min = st.number_input("Minimum protein (g) :", min_value=0, value=0, help="0 = no limit")
 
-    # Application des filtres 
 
-    filtered = df.copy()
+    # Application des filtres (moteur_recherche)
 
-    # Ingrédients : la recette doit contenir TOUS les ingrédients choisis
-    for ing in ingredient_filter:
-        filtered = filtered[
-            filtered["ingredients"].apply(
-                lambda lst: isinstance(lst, list) and ing in lst
-            )
-        ]
+    query = RecipeQuery(
+        ingredients=ingredient_filter,
+        max_time=temps_max,
+        max_calories=calories_max,
+        max_fat=fat_max,
+        max_sugar=sugar_max,
+        min_protein=protein_min,
+    )
 
-    # Temps max 
-    if temps_max > 0 and "total_time_min" in filtered.columns:
-        filtered = filtered[filtered["total_time_min"] <= temps_max]
+    if ranked:
+        # Les 10 recettes qui utilisent le plus d'ingrédients choisis
+        # et en demandent le moins d'autres
+        query.match = "pantry"
+        query.max_missing = max_missing
+        query.limit = 10
+    else:
+        # Toutes les recettes qui contiennent TOUS les ingrédients choisis
+        query.limit = None
 
-    # Calories max 
-    if calories_max > 0 and "calories" in filtered.columns:
-        filtered = filtered[filtered["calories"] <= calories_max]
+    # Positions des recettes retenues : aucune copie du DataFrame ici
+    positions = queries.search(engine, query).positions
 
-    if filtered.empty:
+    if len(positions) == 0:
         st.error("❌ No recipes found with these criteria.")
         st.stop()
 
 
-    # Sélection aléatoire de 10 recettes
+    # Sélection aléatoire de 10 recettes (mode classé : les 10 meilleures),
+    # ou parcours page par page de toutes les recettes retenues
 
-    if "sample_ids" not in st.session_state:
-        st.session_state["sample_ids"] = []
+    if ranked:
+        sample_pos = positions
+    else:
+        view = st.radio("Show :", ("Random selection", "Browse all matches"), horizontal=True)
 
-    relancer = st.button("\U0001F501 Relaunch 10 new random recipes")
+        if view == "Random selection":
+            # Tirage directement dans les positions, avec une graine gardée en
+            # session et dans l'URL (?seed=) : la même sélection est
+            # réaffichée sans rien rechercher, et reproductible
+            if "sample_seed" not in st.session_state:
+                seed = st.query_params.get("seed", "")
+                st.session_state["sample_seed"] = int(seed) if seed.isdigit() else new_seed()
 
-    if relancer or not st.session_state["sample_ids"]:
-        sample = filtered.sample(
-            n=min(10, len(filtered)), random_state=None
-        )
-        st.session_state["sample_ids"] = sample["id"].tolist()
-    else:
-        sample = filtered[filtered["id"].isin(st.session_state["sample_ids"])]
+            if st.button("\U0001F501 Relaunch 10 new random recipes"):
+                st.session_state["sample_seed"] = new_seed()
+
+            seed = st.session_state["sample_seed"]
+            st.query_params["seed"] = str(seed)
+            sample_pos = engine.sample(positions, SAMPLE_SIZE, seed)
+            st.caption(f"{len(positions)} matches · selection #{seed}")
+
+        else:
+            sort_label = st.selectbox("Sort by :", list(BROWSE_SORTS))
+            n_pages = -(-len(positions) // PAGE_SIZE)
+            page = st.number_input("Page :", min_value=1, max_value=n_pages, value=1)
+            # Sélection partielle : seules les pages jusqu'à celle-ci sont triées
+            sample_pos = engine.page(positions, BROWSE_SORTS[sort_label], page - 1, PAGE_SIZE)
+            st.caption(f"{len(positions)} matches · page {page}/{n_pages}")
+
+    # Seules les recettes affichées sont extraites du DataFrame
+    sample = df.iloc[sample_pos]
+
+    if ranked:
+        chosen = set(ingredient_filter)
+        n_distinct = engine.ingredient_index.n_distinct
+        pantry = {}
+        for pos, lst in zip(sample_pos.tolist(), sample["ingredients"]):
+            n_used = len(chosen.intersection(lst))
+            pantry[pos] = (n_used, int(n_distinct[pos]) - n_used)
 
     st.markdown("### \U0001F3AF Recipes matching your criteria")
 
@@ -223,7 +299,7 @@ def render_recipes_page(df: pd.DataFrame):
     cols = st.columns(2)
     selected_id = st.session_state.get("selected_recipe_id", None)
 
-    for idx, (_, row) in enumerate(sample.iterrows()):
+    for idx, (pos, row) in enumerate(sample.iterrows()):
         col = cols[idx % 2]
         with col:
             card = st.container(border=True)
@@ -231,6 +307,11 @@ def render_recipes_page(df: pd.DataFrame):
 
                 st.markdown(f"**{row['name']}**")
                 infos = []
+                if ranked:
+                    n_used, n_missing = pantry[pos]
+                    infos.append(
+                        f"\U0001F9FA {n_used}/{len(ingredient_filter)} used · {n_missing} missing"
+                    )
                 if "total_time_min" in row and row["total_time_min"] > 0:
                     infos.append(f"⏱️ {int(row['total_time_min'])} min")
                 if "calories" in row and row["calories"] > 0:
@@ -251,14 +332,14 @@ def render_recipes_page(df: pd.DataFrame):
     # Fiche détaillée (mode ingrédients)
 
     if selected_id is not None:
+        # Position de la recette en O(1), puis fiche depuis le cache partagé
         try:
             selected_id_int = int(selected_id)
+            current = engine.positions_of([selected_id_int])[0]
         except (ValueError, TypeError):
-            selected_id_int = selected_id  
+            current = -1
 
-        current = filtered[filtered["id"] == selected_id_int]
-
-        if current.empty:
+        if current < 0 or not np.any(positions == current):
             st.info(
                 "The recipe you selected is no longer part of the results "
                 "with the current filters."
@@ -267,91 +348,6 @@ def render_recipes_page(df: pd.DataFrame):
             st.session_state["selected_recipe_id"] = None
 
         else:
-            recette = current.iloc[0]
-
             st.markdown("---")
             st.markdown("## \U0001F4C4 Details of the selected recipe")
-
-            st.subheader(recette["name"])
-
-            # Description
-            st.markdown("### \U0001F4DD Description")
-            st.write(recette["description"])
-
-            # Ingredients
-            st.markdown("### \U0001F9C2 Ingredients")
-            if isinstance(recette["ingredients"], list):
-                for ing in recette["ingredients"]:
-                    st.write(f"- {ing}")
-            else:
-                st.write("Ingredients unavailable for this recipe.")
-
-            # Quantities
-            st.markdown("### ⚖️ Quantities")
-            if isinstance(recette["quantities"], list) and isinstance(recette["ingredients"], list) \
-            and len(recette["quantities"]) == len(recette["ingredients"]):
-                for q, i in zip(recette["quantities"], recette["ingredients"]):
-                    st.write(f"- **{i}** : {q}")
-            else:
-                st.warning("Quantities unavailable for this recipe.")
-
-            # Instructions
-            st.markdown("### 👩‍🍳 Steps")
-            if isinstance(recette["instructions"], list):
-                for step in recette["instructions"]:
-                    st.write(f"- {step}")
-            else:
-                st.write(recette["instructions"])
-
-            # Nutrition 
-            st.markdown("### \U0001F955 Nutritional information : ")
-
-            cal = recette.get("calories", None)
-            fat = recette.get("fat", None)
-            sugar = recette.get("sugar", None)
-            protein = recette.get("protein", None)
-
-            def fmt(value, suffix=""):
-                if value is None or (isinstance(value, (int, float)) and pd.isna(value)):
-                    return "N/A"
-                v = round(float(value), 1)
-                if v.is_integer():
-                    v = int(v)
-                return f"{v}{suffix}"
-
-            col1, col2, col3, col4 = st.columns(4)
-
-            with col1:
-                st.markdown(f"""
-                <div style='padding:15px; background-color:#95d5b2; border-radius:10px; text-align:center;'>
-                    <h4 style='margin-bottom:5px;'>\U0001F525 Calories</h4>
-                    <p style='font-size:20px; font-weight:600; margin:0;'>{fmt(cal, " kcal")}</p>
-                </div>
-                """, unsafe_allow_html=True)
-
-            with col2:
-                st.markdown(f"""
-                <div style='padding:15px; background-color:#74c69d; border-radius:10px; text-align:center;'>
-                    <h4 style='margin-bottom:5px;'>\U0001F951 Fat</h4>
-                    <p style='font-size:20px; font-weight:600; margin:0;'>{fmt(fat, " g")}</p>
-                </div>
-                """, unsafe_allow_html=True)
-
-            with col3:
-                st.markdown(f"""
-                <div style='padding:15px; background-color:#52b788; border-radius:10px; text-align:center;'>
-                    <h4 style='margin-bottom:5px;'>\U0001F9C1 Sugar</h4>
-                    <p style='font-size:20px; font-weight:600; margin:0;'>{fmt(sugar, " g")}</p>
-                </div>
-                """, unsafe_allow_html=True)
-
-            with col4:
-                st.markdown(f"""
-                <div style='padding:15px; background-color:#4aa87f; border-radius:10px; text-align:center;'>
-                    <h4 style='margin-bottom:5px;'>\U0001F357 Protein</h4>
-                    <p style='font-size:20px; font-weight:600; margin:0;'>{fmt(protein, " g")}</p>
-                </div>
-                """, unsafe_allow_html=True)
-
-
-
+            render_recipe_detail(details.get(selected_id_int))
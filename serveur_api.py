@@ -0,0 +1,196 @@
+"""
+Service HTTP JSON local pour la recherche de recettes (asyncio, sans
+dépendance externe).
+
+    python serveur_api.py --port 8765 --workers 4
+
+Points d'entrée :
+    GET  /health
+    GET  /stats
+    GET  /search?ingredients=chicken,garlic&max_time=45&limit=10
+    POST /search   (corps JSON : champs de RecipeQuery)
+
+Le jeu de données et les index sont chargés une seule fois par processus.
+Les requêtes identiques reçues en même temps sont regroupées (un seul calcul
+partagé), les résultats déjà calculés sont servis depuis un cache LRU
+(cache_requetes), et les recherches tournent dans un pool de threads pour garder la
+boucle d'événements réactive.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from moteur_recherche import RecipeQuery, RecipeQueryEngine
+from cache_requetes import QueryCache
+
+# Taille maximale du corps d'une requête POST
+MAX_BODY = 64 * 1024
+
+# Nombre maximal de résultats par réponse
+MAX_RESULTS = 1000
+
+# Champs renvoyés pour chaque recette
+RESULT_FIELDS = ("id", "name", "category", "total_time_min", "calories", "rating", "reviews")
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def query_from_params(params: dict) -> RecipeQuery:
+    """Construit une RecipeQuery depuis les paramètres d'URL (?a=1&b=2)."""
+    data = {k: v[-1] for k, v in params.items()}
+    if "ingredients" in data:
+        data["ingredients"] = [x.strip() for x in data["ingredients"].split(",") if x.strip()]
+    for key in ("max_time", "limit", "max_missing"):
+        if key in data:
+            data[key] = int(data[key])
+    for key in ("max_calories", "max_fat", "max_sugar", "min_protein"):
+        if key in data:
+            data[key] = float(data[key])
+    return RecipeQuery.from_dict(data)
+
+
+def _json_value(v):
+    if isinstance(v, np.integer):
+        return int(v)
+    if isinstance(v, (np.floating, float)):
+        return None if np.isnan(v) else float(v)
+    return v
+
+
+class SearchService:
+    """
+    Recherche partagée + regroupement des requêtes identiques en cours +
+    cache des résultats (requêtes déjà vues).
+    """
+
+    def __init__(self, engine: RecipeQueryEngine, workers: int = 4):
+        self.engine = engine
+        self.cache = QueryCache()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search")
+        self.in_flight = {}
+        self.stats = {"requests": 0, "searches": 0, "coalesced": 0, "errors": 0}
+
+    def _run(self, query: RecipeQuery) -> dict:
+        result = self.cache.search(self.engine, query)
+        rows = self.engine.df.iloc[result.positions]
+        items = []
+        for (_, row), score in zip(rows.iterrows(), result.scores):
+            item = {f: _json_value(row[f]) for f in RESULT_FIELDS if f in row}
+            item["score"] = float(score)
+            items.append(item)
+        return {"count": len(items), "results": items}
+
+    async def search(self, query: RecipeQuery) -> dict:
+        key = json.dumps(asdict(query), sort_keys=True)
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(task)
+
+        loop = asyncio.get_running_loop()
+        task = asyncio.ensure_future(loop.run_in_executor(self.pool, self._run, query))
+        self.in_flight[key] = task
+        task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        self.stats["searches"] += 1
+        return await asyncio.shield(task)
+
+    async def dispatch(self, method: str, target: str, body: bytes):
+        """Renvoie (status, objet JSON) pour une requête HTTP."""
+        url = urlsplit(target)
+
+        if url.path == "/health":
+            return 200, {"status": "ok", "recipes": len(self.engine.df)}
+        if url.path == "/stats":
+            return 200, dict(self.stats, in_flight=len(self.in_flight), cache=self.cache.stats())
+        if url.path != "/search":
+            return 404, {"error": "not found"}
+
+        try:
+            if method == "GET":
+                query = query_from_params(parse_qs(url.query))
+            elif method == "POST":
+                query = RecipeQuery.from_dict(json.loads(body or b"{}"))
+            else:
+                return 405, {"error": "method not allowed"}
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+
+        # Réponses toujours limitées à 1..MAX_RESULTS recettes
+        if query.limit is not None and query.limit < 1:
+            return 400, {"error": "limit must be >= 1"}
+        if query.limit is None or query.limit > MAX_RESULTS:
+            query.limit = MAX_RESULTS
+
+        return 200, await self.search(query)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        status, payload = 500, {"error": "internal error"}
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = lines[0].split(" ", 2)
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    k, v = line.split(":", 1)
+                    headers[k.strip().lower()] = v.strip()
+
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY:
+                status, payload = 413, {"error": "body too large"}
+            else:
+                body = await reader.readexactly(length) if length else b""
+                self.stats["requests"] += 1
+                status, payload = await self.dispatch(method, target, body)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            status, payload = 400, {"error": "malformed request"}
+        except Exception as e:  # noqa: BLE001 - on renvoie toujours une réponse JSON
+            status, payload = 500, {"error": repr(e)}
+
+        if status >= 400:
+            self.stats["errors"] += 1
+
+        data = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve(host: str, port: int, workers: int) -> None:
+    engine = RecipeQueryEngine.from_pipeline()
+    service = SearchService(engine, workers=workers)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Serving {len(engine.df)} recipes on http://{host}:{port}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Local JSON recipe search service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4, help="search threads")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Télémétrie de l'ingestion : durée, temps CPU, hausse du pic RSS et lignes
+en entrée / sortie de chaque étape de load_recipes.
+
+Chaque étape est enregistrée dans un IngestionReport (une ligne par nom
+d'étape, cumulée sur les blocs en mode streaming / parallèle) et écrite
+dans les logs sous forme d'une ligne JSON, au niveau INFO.
+
+Par défaut ni Streamlit ni les scripts ne configurent ce niveau : les
+lignes ne sont affichées (sur stderr) qu'avec
+
+    RECIPE_FINDER_LOG_LEVEL=INFO streamlit run app.py
+
+ou si l'application configure elle-même le module logging.
+"""
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows : pas de getrusage
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Variable d'environnement du niveau des logs de télémétrie (INFO, DEBUG...)
+LOG_LEVEL_ENV = "RECIPE_FINDER_LOG_LEVEL"
+
+
+def configure_logging() -> None:
+    """
+    Affiche les logs de télémétrie sur stderr au niveau donné par
+    RECIPE_FINDER_LOG_LEVEL. Sans cette variable (ou si un handler est déjà
+    en place), la configuration logging de l'application s'applique.
+    """
+    level = logging.getLevelName(os.environ.get(LOG_LEVEL_ENV, "").upper())
+    if not isinstance(level, int) or logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def peak_rss_mb() -> float | None:
+    """Pic de mémoire résidente du processus depuis son démarrage (Mo)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en kilo-octets ailleurs
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def current_rss_mb() -> float | None:
+    """Mémoire résidente actuelle du processus (Mo), Linux seulement."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * resource.getpagesize() / 2**20 if resource is not None else None
+
+
+def _rows(obj) -> int | None:
+    """Nombre de lignes d'un DataFrame / Series / tableau numpy (None sinon)."""
+    shape = getattr(obj, "shape", None)
+    return int(shape[0]) if shape else None
+
+
+@dataclass
+class StageMetrics:
+    """
+    Mesures d'une étape (cumulées si l'étape tourne plusieurs fois).
+
+    - calls : nombre d'exécutions (blocs)
+    - wall_s / cpu_s : durée réelle et temps CPU du processus
+    - rss_delta_mb : plus forte hausse du pic RSS pendant une exécution
+    - rows_in / rows_out : lignes en entrée / en sortie
+    """
+    name: str
+    calls: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rss_delta_mb: float | None = None
+    rows_in: int | None = None
+    rows_out: int | None = None
+
+    def add(self, other: "StageMetrics") -> None:
+        self.calls += other.calls
+        self.wall_s += other.wall_s
+        self.cpu_s += other.cpu_s
+        if other.rss_delta_mb is not None:
+            self.rss_delta_mb = max(self.rss_delta_mb or 0.0, other.rss_delta_mb)
+        if other.rows_in is not None:
+            self.rows_in = (self.rows_in or 0) + other.rows_in
+        if other.rows_out is not None:
+            self.rows_out = (self.rows_out or 0) + other.rows_out
+
+
+@dataclass
+class IngestionReport:
+    """
+    Rapport d'une ingestion : étapes dans l'ordre de première exécution.
+
+    En mode parallèle, les étapes exécutées dans les processus du pool sont
+    fusionnées : leurs durées sont donc additionnées sur tous les processus.
+    """
+    source: str = ""
+    mode: str = ""
+    stages: dict = field(default_factory=dict)
+    started_at: float = field(default_factory=time.time)
+
+    def record(self, metrics: StageMetrics) -> None:
+        stage = self.stages.get(metrics.name)
+        if stage is None:
+            self.stages[metrics.name] = stage = StageMetrics(metrics.name)
+        stage.add(metrics)
+
+    def merge(self, other: "IngestionReport") -> None:
+        for metrics in other.stages.values():
+            self.record(metrics)
+
+    @property
+    def total_wall_s(self) -> float:
+        return sum(s.wall_s for s in self.stages.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "total_wall_s": round(self.total_wall_s, 6),
+            "stages": [asdict(s) for s in self.stages.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IngestionReport":
+        report = cls(source=data.get("source", ""), mode=data.get("mode", ""),
+                     started_at=data.get("started_at", 0.0))
+        for s in data.get("stages", []):
+            report.record(StageMetrics(**s))
+        return report
+
+    def save(self, path: Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "IngestionReport | None":
+        try:
+            return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def log(self) -> None:
+        """Une ligne JSON par étape, puis une ligne de synthèse."""
+        configure_logging()
+        for s in self.stages.values():
+            logger.info(json.dumps({"event": "ingestion_stage", "source": self.source,
+                                    "mode": self.mode, **asdict(s)}))
+        logger.info(json.dumps({"event": "ingestion_total", "source": self.source,
+                                "mode": self.mode, "stages": len(self.stages),
+                                "total_wall_s": round(self.total_wall_s, 6)}))
+
+
+def run_stage(report: IngestionReport | None, name: str, fn, *args, **kwargs):
+    """
+    Exécute fn(*args, **kwargs) comme étape `name` du rapport. Les lignes en
+    entrée sont celles du premier argument, celles en sortie celles du
+    résultat (None si ce ne sont pas des DataFrame / tableaux).
+    """
+    if report is None:
+        return fn(*args, **kwargs)
+
+    rss0 = peak_rss_mb()
+    cpu0 = time.process_time()
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    wall = time.perf_counter() - t0
+    cpu = time.process_time() - cpu0
+    rss1 = peak_rss_mb()
+
+    report.record(StageMetrics(
+        name=name,
+        calls=1,
+        wall_s=wall,
+        cpu_s=cpu,
+        rss_delta_mb=None if rss0 is None else rss1 - rss0,
+        rows_in=_rows(args[0]) if args else None,
+        rows_out=_rows(out),
+    ))
+    return out
+
+
+def timed_iter(report: IngestionReport | None, name: str, iterable):
+    """Itère sur `iterable` en comptant chaque élément produit comme une exécution de `name`."""
+    it = iter(iterable)
+    while True:
+        try:
+            item = run_stage(report, name, next, it)
+        except StopIteration:
+            return
+        yield item
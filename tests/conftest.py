@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Modules de l'application à la racine du dépôt, générateur de CSV des benchmarks
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "benchmarks"))
+
+
+@pytest.fixture(scope="session")
+def recipes_csv(tmp_path_factory):
+    """Petit CSV synthétique au format du CSV brut."""
+    from generer_csv import generate_csv
+    return generate_csv(tmp_path_factory.mktemp("data") / "recipes.csv", 3000, seed=0)
+
+
+@pytest.fixture(scope="session")
+def recipes_df(recipes_csv):
+    """Jeu de données traité par le pipeline (lecture en streaming)."""
+    from data_pipeline import run_pipeline
+    return run_pipeline(recipes_csv, chunksize=1000)
@@ -0,0 +1,46 @@
+"""Parsing des vecteurs R : version colonne contre version cellule par cellule."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from forme_list import offsets_to_lists, parse_r_vector, parse_r_vector_column
+
+CORPUS = [
+    'c("a", "b", "c")',
+    '  c("leading", "spaces")',
+    'c("1/2", "3", NA, "4")',
+    'c(NA, NA)',
+    'c("b \\"q\\" c", "x")',
+    'c("line\nbreak", "after")',
+    'c("a",\n"b")',
+    'c("comma, inside", "plain")',
+    'c("")',
+    "character(0)",
+    "NA",
+    '"not a vector"',
+    "plain text, with comma",
+    "",
+    None,
+    np.nan,
+    12.5,
+]
+
+
+def test_column_parser_matches_cell_parser():
+    s = pd.Series(CORPUS, dtype=object, name="ingredients")
+    offsets, values = parse_r_vector_column(s)
+
+    assert offsets.shape == (len(CORPUS) + 1,)
+    assert offsets_to_lists(offsets, values) == [parse_r_vector(x) for x in CORPUS]
+
+
+def test_column_parser_keeps_empty_rows():
+    s = pd.Series(["character(0)", 'c("a")', None], dtype=object)
+    offsets, values = parse_r_vector_column(s)
+    assert offsets.tolist() == [0, 0, 1, 1]
+    assert values.tolist() == ["a"]
+
+
+def test_column_parser_rejects_nul():
+    with pytest.raises(ValueError, match="NUL"):
+        parse_r_vector_column(pd.Series(['c("a\x00b")'], name="steps"))
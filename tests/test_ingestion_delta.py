@@ -0,0 +1,55 @@
+"""Index mis à jour par un delta comparés à une reconstruction complète."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from generer_csv import generate_csv
+from index_ingredients import build_ingredient_index
+from index_noms import build_name_index
+from index_texte import build_text_index
+from ingestion_delta import TOMBSTONE_COL, DatasetState, apply_delta
+
+TEXT_COLUMNS = ["name", "description", "instructions"]
+
+
+def assert_same_arrays(patched: dict, rebuilt: dict):
+    assert patched.keys() == rebuilt.keys()
+    for name, expected in rebuilt.items():
+        actual = patched[name]
+        if np.issubdtype(expected.dtype, np.floating):
+            np.testing.assert_allclose(actual, expected, err_msg=name)
+        else:
+            np.testing.assert_array_equal(actual, expected, err_msg=name)
+
+
+@pytest.fixture
+def delta_csv(tmp_path, recipes_df):
+    """Delta : recettes modifiées, nouvelles recettes et tombstones."""
+    delta = pd.read_csv(generate_csv(tmp_path / "raw.csv", 300, seed=1))
+    ids = recipes_df["id"].to_numpy()
+    rng = np.random.default_rng(1)
+    delta["RecipeId"] = np.where(rng.random(len(delta)) < 0.5,
+                                 rng.choice(ids, len(delta)),
+                                 ids.max() + 1 + np.arange(len(delta)))
+    delta[TOMBSTONE_COL] = np.where(rng.random(len(delta)) < 0.2, "yes", "")
+    path = tmp_path / "delta.csv"
+    delta.to_csv(path, index=False)
+    return path
+
+
+def test_patched_indexes_match_full_rebuild(recipes_df, delta_csv):
+    state = DatasetState(
+        recipes_df,
+        build_ingredient_index(recipes_df["ingredients"]),
+        build_name_index(recipes_df["name"]),
+        build_text_index(recipes_df[TEXT_COLUMNS]),
+    )
+    new = apply_delta(state, delta_csv)
+    df = new.df
+
+    assert df["id"].is_unique
+    assert len(df) != len(recipes_df)
+    assert_same_arrays(new.ingredient_index.to_arrays(),
+                       build_ingredient_index(df["ingredients"]).to_arrays())
+    assert_same_arrays(new.name_index.to_arrays(), build_name_index(df["name"]).to_arrays())
+    assert_same_arrays(new.text_index.to_arrays(), build_text_index(df[TEXT_COLUMNS]).to_arrays())
@@ -0,0 +1,103 @@
+"""Plan de filtrage du moteur comparé à un filtrage exhaustif (force brute)."""
+import numpy as np
+import pytest
+
+from index_ingredients import build_ingredient_index
+from index_noms import build_name_index
+from index_texte import build_text_index
+from moteur_recherche import RANGE_FILTERS, RecipeQuery, RecipeQueryEngine
+
+
+@pytest.fixture(scope="module")
+def engine(recipes_df):
+    return RecipeQueryEngine(
+        recipes_df,
+        build_ingredient_index(recipes_df["ingredients"]),
+        build_name_index(recipes_df["name"]),
+        build_text_index(recipes_df[["name", "description", "instructions"]]),
+    )
+
+
+def random_queries(engine, n, seed=0):
+    """Requêtes "all" : 0 à 3 ingrédients (dont des inconnus) et 0 à 3 plages."""
+    rng = np.random.default_rng(seed)
+    vocab = engine.ingredient_index.vocab.tolist()
+    for _ in range(n):
+        query = RecipeQuery(limit=None)
+        n_ing = rng.integers(0, 4)
+        query.ingredients = [vocab[i] for i in rng.integers(0, min(len(vocab), 40), n_ing)]
+        if rng.random() < 0.1:
+            query.ingredients.append("no such ingredient")
+        for attr in rng.choice(list(RANGE_FILTERS), rng.integers(0, 4), replace=False):
+            col = RANGE_FILTERS[attr][0]
+            setattr(query, attr, float(np.nanquantile(engine.range_values[col], rng.random())))
+        yield query
+
+
+def brute_force(engine, query):
+    """Masque de toutes les recettes qui vérifient la requête, ligne par ligne."""
+    df = engine.df
+    mask = np.ones(len(df), dtype=bool)
+    wanted = set(query.ingredients)
+    if wanted:
+        mask &= np.array([wanted.issubset(lst) for lst in df["ingredients"]])
+    for attr, (col, side) in RANGE_FILTERS.items():
+        limit = getattr(query, attr)
+        if limit > 0:
+            v = df[col].to_numpy(dtype=float)
+            mask &= (v <= limit) if side == "max" else (v >= limit)
+    return mask
+
+
+def test_plan_is_sorted_and_counts_are_exact(engine):
+    lists = engine.df["ingredients"]
+    for query in random_queries(engine, 100):
+        plan = engine.plan(query)
+        assert [p[0] for p in plan] == sorted(p[0] for p in plan)
+        for count, kind, arg in plan:
+            if kind == "ingredient":
+                name = engine.ingredient_index.vocab[arg] if arg >= 0 else None
+                assert count == sum(name in lst for lst in lists)
+            else:
+                col, lo, hi = arg
+                v = engine.df[col].to_numpy(dtype=float)
+                assert count == ((v >= lo) & (v <= hi)).sum()
+
+
+def test_candidates_and_satisfies_match_brute_force(engine):
+    rng = np.random.default_rng(1)
+    for query in random_queries(engine, 300):
+        expected = np.flatnonzero(brute_force(engine, query))
+        plan = engine.plan(query)
+        if plan:
+            np.testing.assert_array_equal(engine.candidates(plan), expected)
+
+        positions = np.sort(rng.choice(len(engine.df), 500, replace=False))
+        np.testing.assert_array_equal(positions[engine.satisfies(positions, plan)],
+                                      np.intersect1d(positions, expected))
+
+
+def test_search_matches_brute_force(engine):
+    for query in random_queries(engine, 300, seed=2):
+        result = engine.search(query)
+        np.testing.assert_array_equal(np.sort(result.positions),
+                                      np.flatnonzero(brute_force(engine, query)))
+
+
+def test_pantry_top_k_matches_full_ranking(engine):
+    for query in random_queries(engine, 100, seed=3):
+        if not query.ingredients:
+            continue
+        query.match = "pantry"
+        query.max_missing = 4
+        full = engine.search(query)
+
+        # Toutes les recettes classées vérifient les plages
+        ranges = RecipeQuery(**{attr: getattr(query, attr) for attr in RANGE_FILTERS})
+        assert brute_force(engine, ranges)[full.positions].all()
+
+        for limit in (0, 1, 10):
+            query.limit = limit
+            top = engine.search(query)
+            np.testing.assert_array_equal(top.positions, full.positions[:limit])
+            np.testing.assert_array_equal(top.scores, full.scores[:limit])
@@ -0,0 +1,144 @@
+"""
+Téléchargement reprenable (data_pipeline.download_once / _fetch_to_tmp)
+contre un serveur HTTP local.
+"""
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import data_pipeline
+from data_pipeline import _meta_path, download_once
+
+BODY = bytes(range(256)) * 400
+ETAG = '"v1"'
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Sert BODY avec un ETag ; gère If-None-Match (304) et Range + If-Range
+    (206). `server.range_mode` simule un serveur qui refuse la plage ("416")
+    ou en renvoie une autre que celle demandée ("mismatch").
+    """
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") == ETAG:
+            mode = self.server.range_mode
+            if mode == "416":
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(BODY)}")
+                self.end_headers()
+                return
+            start = 0 if mode == "mismatch" else int(range_header[len("bytes="):].split("-")[0])
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(BODY) - 1}/{len(BODY)}")
+        else:
+            self.send_response(200)
+
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(BODY) - start))
+        self.end_headers()
+        self.wfile.write(BODY[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.requests = []
+    httpd.range_mode = None
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/recipes.csv"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def partial_tmp(dest, n):
+    """.tmp laissé par un transfert interrompu après `n` octets."""
+    tmp = dest.with_suffix(".tmp")
+    tmp.write_bytes(BODY[:n])
+    _meta_path(tmp).write_text(json.dumps({"etag": ETAG, "last_modified": None,
+                                           "size": len(BODY)}))
+    return tmp
+
+
+def test_fresh_download(server, tmp_path):
+    dest = tmp_path / "recipes.csv"
+    sha = hashlib.sha256(BODY).hexdigest()
+
+    assert download_once(server.url, dest, sha256=sha) == dest
+    assert dest.read_bytes() == BODY
+    meta = json.loads(_meta_path(dest).read_text())
+    assert meta["etag"] == ETAG and meta["sha256"] == sha
+    assert not dest.with_suffix(".tmp").exists()
+    assert "Range" not in server.requests[0]
+
+
+def test_revalidation_not_modified(server, tmp_path):
+    dest = tmp_path / "recipes.csv"
+    download_once(server.url, dest)
+    mtime = dest.stat().st_mtime_ns
+
+    assert download_once(server.url, dest) == dest
+    assert len(server.requests) == 2
+    assert server.requests[1]["If-None-Match"] == ETAG
+    assert dest.stat().st_mtime_ns == mtime
+    assert dest.read_bytes() == BODY
+
+
+def test_resume_from_partial_tmp(server, tmp_path):
+    dest = tmp_path / "recipes.csv"
+    partial_tmp(dest, 1000)
+
+    download_once(server.url, dest)
+    assert dest.read_bytes() == BODY
+    assert len(server.requests) == 1
+    assert server.requests[0]["Range"] == "bytes=1000-"
+    assert server.requests[0]["If-Range"] == ETAG
+
+
+def test_checksum_mismatch(server, tmp_path):
+    dest = tmp_path / "recipes.csv"
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        download_once(server.url, dest, sha256="0" * 64)
+    assert not dest.exists()
+    assert not dest.with_suffix(".tmp").exists()
+    assert not _meta_path(dest.with_suffix(".tmp")).exists()
+
+
+@pytest.mark.parametrize("range_mode", ["416", "mismatch"])
+def test_rejected_range_restarts(server, tmp_path, range_mode):
+    dest = tmp_path / "recipes.csv"
+    partial_tmp(dest, 1000)
+    server.range_mode = range_mode
+
+    download_once(server.url, dest)
+    assert dest.read_bytes() == BODY
+    assert len(server.requests) == 2
+    assert "Range" in server.requests[0]
+    assert "Range" not in server.requests[1]
+
+
+def test_gives_up_after_retries(server, tmp_path, monkeypatch):
+    dest = tmp_path / "recipes.csv"
+    partial_tmp(dest, 1000)
+    server.range_mode = "416"
+    monkeypatch.setattr(data_pipeline, "DOWNLOAD_RETRIES", 1)
+
+    with pytest.raises(OSError, match="did not complete"):
+        download_once(server.url, dest)